@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, unicode_literals
+
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+
+from drf_haystack.utils import closing_connections, get_executor
+from drf_haystack.viewsets import HaystackViewSet
+
+
+class AsyncViewMixin(object):
+    """
+    Mixin class which turns an API View into an async view, for ASGI deployments.
+
+    The view is run in a bounded thread pool (``async_executor``, which defaults
+    to ``drf_haystack.utils.get_executor()``) rather than in Django's single thread
+    for synchronous views, so that requests waiting for the search engine or the
+    database don't wait for each other.
+
+    Requires asgiref 3.3.2 or later (which comes with Django 3.2 and later).
+    """
+
+    async_executor = None
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        view = closing_connections(super(AsyncViewMixin, cls).as_view(*args, **kwargs))
+
+        async def async_view(request, *args, **kwargs):
+            executor = cls.async_executor or get_executor()
+            return await sync_to_async(view, thread_sensitive=False, executor=executor)(request, *args, **kwargs)
+
+        return update_wrapper(async_view, view)
+
+
+class AsyncHaystackViewSet(AsyncViewMixin, HaystackViewSet):
+    """
+    An async ``HaystackViewSet`` for ASGI deployments. The actions (including
+    those of the ``FacetMixin`` and ``MoreLikeThisMixin``) are run in a bounded
+    thread pool, see ``AsyncViewMixin``.
+    """
+    pass
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, unicode_literals
+
+import hashlib
+import time
+
+from django.core.cache import caches
+from haystack.signals import RealtimeSignalProcessor
+
+from drf_haystack import constants
+from drf_haystack.utils import index_model_resolver
+
+
+def get_cache():
+    """
+    Returns the Django cache used for caching search responses.
+    """
+    return caches[constants.DRF_HAYSTACK_CACHE_ALIAS]
+
+
+def make_cache_key(*parts):
+    """
+    Returns a cache key for the (``repr()``-able) ``parts``, which
+    is short and safe enough for any of the Django cache backends.
+    """
+    digest = hashlib.md5(repr(parts).encode("utf-8")).hexdigest()
+    return "%s:%s" % (constants.DRF_HAYSTACK_CACHE_KEY_PREFIX, digest)
+
+
+def get_model_version_key(model):
+    return "%s:version:%s" % (constants.DRF_HAYSTACK_CACHE_KEY_PREFIX, model._meta.label_lower)
+
+
+def get_model_versions(models):
+    """
+    Returns a tuple with the current cache version of each of the ``models``.
+    Cache entries are keyed on these versions, so bumping the version of a
+    model (see ``invalidate_models()``) evicts all the entries depending on it.
+    """
+    cache = get_cache()
+    keys = [get_model_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Start at the current time rather than at 0, so that an evicted
+            # version never falls back to a value which has been used before.
+            cache.add(key, int(time.time() * 1000), None)
+            versions[key] = cache.get(key)
+    return tuple(versions[key] for key in keys)
+
+
+def invalidate_models(*models):
+    """
+    Evicts all cached responses depending on any of the ``models``.
+    """
+    cache = get_cache()
+    for model in models:
+        key = get_model_version_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, int(time.time() * 1000), None)
+
+
+def get_query_signature(queryset):
+    """
+    Returns a tuple identifying the effective query of a ``SearchQuerySet``,
+    that is the filters, narrowing and faceting, but not the ordering or the
+    slice of the results which is fetched.
+    """
+    query = queryset.query
+    return (
+        query._using,
+        sorted(model._meta.label_lower for model in query.models),
+        query.build_query(),
+        sorted(query.narrow_queries),
+        sorted(query.facets.items()),
+        sorted(query.date_facets.items()),
+        sorted(query.query_facets),
+        _get_geo_signature(query.within),
+        _get_geo_signature(query.dwithin),
+        query._raw_query,
+        query._raw_query_params,
+    )
+
+
+def _get_geo_signature(params):
+    """
+    Returns the ``within`` or ``dwithin`` parameters of a query, with the
+    points and distances (whose ``repr()`` isn't stable) as plain values.
+    """
+    signature = []
+    for key, value in sorted(params.items()):
+        if hasattr(value, "coords"):  # A GEOS point
+            value = (value.srid, value.coords)
+        elif hasattr(value, "m"):  # A distance
+            value = value.m
+        signature.append((key, value))
+    return signature
+
+
+def get_or_set(key, func, timeout, is_cacheable=None):
+    """
+    Returns the cached value for ``key``, or calls ``func()`` and caches the
+    result for ``timeout`` seconds if ``is_cacheable(value)`` allows it.
+    ``timeout`` may also be a function returning the timeout for the value.
+
+    Only one caller at a time computes the value for a key (the others wait
+    for it to be cached), which protects the search engine from a stampede
+    of identical queries when a popular entry expires.
+    """
+    cache = get_cache()
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = "%s:lock" % key
+    lock_timeout = constants.DRF_HAYSTACK_CACHE_LOCK_TIMEOUT
+    deadline = time.time() + lock_timeout
+
+    locked = cache.add(lock_key, True, lock_timeout)
+    while not locked and time.time() < deadline:
+        time.sleep(constants.DRF_HAYSTACK_CACHE_LOCK_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        locked = cache.add(lock_key, True, lock_timeout)
+
+    # If we didn't get the lock, whoever had it took too long (or failed),
+    # so we'll compute the value ourselves.
+    try:
+        value = func()
+        if value is not None and (is_cacheable is None or is_cacheable(value)):
+            cache.set(key, value, timeout(value) if callable(timeout) else timeout)
+        return value
+    finally:
+        if locked:
+            cache.delete(lock_key)
+
+
+class CacheInvalidationMixin(object):
+    """
+    Signal processor mixin which evicts the cached search responses
+    depending on a model whenever an indexed instance is saved or deleted.
+    """
+
+    def invalidate(self, sender):
+        if sender in index_model_resolver.get_indexed_models().values():
+            invalidate_models(sender)
+
+    def handle_save(self, sender, instance, **kwargs):
+        super(CacheInvalidationMixin, self).handle_save(sender, instance, **kwargs)
+        self.invalidate(sender)
+
+    def handle_delete(self, sender, instance, **kwargs):
+        super(CacheInvalidationMixin, self).handle_delete(sender, instance, **kwargs)
+        self.invalidate(sender)
+
+
+class CachedRealtimeSignalProcessor(CacheInvalidationMixin, RealtimeSignalProcessor):
+    """
+    A ``RealtimeSignalProcessor`` which also evicts the cached search responses.
+    Enable it with the ``HAYSTACK_SIGNAL_PROCESSOR`` setting.
+    """
+    pass
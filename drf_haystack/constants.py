@@ -3,3 +3,9 @@ from django.conf import settings
 DRF_HAYSTACK_NEGATION_KEYWORD = getattr(settings, "DRF_HAYSTACK_NEGATION_KEYWORD", "not")
 GEO_SRID = getattr(settings, "GEO_SRID", 4326)
 DRF_HAYSTACK_SPATIAL_QUERY_PARAM = getattr(settings, "DRF_HAYSTACK_SPATIAL_QUERY_PARAM", "from")
+DRF_HAYSTACK_QUERY_CACHE_SIZE = getattr(settings, "DRF_HAYSTACK_QUERY_CACHE_SIZE", 256)
+DRF_HAYSTACK_CACHE_ALIAS = getattr(settings, "DRF_HAYSTACK_CACHE_ALIAS", "default")
+DRF_HAYSTACK_CACHE_KEY_PREFIX = getattr(settings, "DRF_HAYSTACK_CACHE_KEY_PREFIX", "drf_haystack")
+DRF_HAYSTACK_CACHE_LOCK_TIMEOUT = getattr(settings, "DRF_HAYSTACK_CACHE_LOCK_TIMEOUT", 10)
+DRF_HAYSTACK_CACHE_LOCK_POLL_INTERVAL = getattr(settings, "DRF_HAYSTACK_CACHE_LOCK_POLL_INTERVAL", 0.05)
+DRF_HAYSTACK_MAX_WORKERS = getattr(settings, "DRF_HAYSTACK_MAX_WORKERS", 32)
@@ -95,11 +95,7 @@ class FacetDictField(fields.DictField):
     """
 
     def to_representation(self, value):
-        return dict(
-            [(six.text_type(key), self.child.to_representation(key, val))
-             for key, val in value.items()
-             ]
-        )
+        return {six.text_type(key): self.child.to_representation(key, val) for key, val in value.items()}
 
 
 class FacetListField(fields.ListField):
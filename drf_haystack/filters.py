@@ -7,6 +7,7 @@ import six
 from functools import reduce
 
 from django.core.exceptions import ImproperlyConfigured
+from haystack import connections
 from haystack.query import SearchQuerySet
 from rest_framework.filters import BaseFilterBackend, OrderingFilter
 
@@ -22,7 +23,19 @@ class BaseHaystackFilterBackend(BaseFilterBackend):
 
     @staticmethod
     def get_request_filters(request):
-        return request.query_params.copy()
+        """
+        Return the query parameters of the request as an immutable ``QueryDict``.
+        It's created once per request and shared by all the filter backends, so
+        make a ``copy()`` if you need to modify it.
+        """
+        filters = getattr(request, "_haystack_request_filters", None)
+        if filters is None:
+            filters = request.query_params
+            if getattr(filters, "_mutable", False):
+                filters = filters.copy()
+                filters._mutable = False
+            request._haystack_request_filters = filters
+        return filters
 
     def apply_filters(self, queryset, applicable_filters=None, applicable_exclusions=None):
         """
@@ -151,12 +164,43 @@ class HaystackHighlightFilter(HaystackFilter):
 
     This will add a ``hightlighted`` entry to your response, encapsulating the
     highlighted words in an `<em>highlighted results</em>` block.
+
+    Highlighting is only enabled if the query parameters produced a filter.
+    The ``highlight_fields``, ``highlight_fragment_size`` and
+    ``highlight_number_of_fragments`` attributes are passed on to the
+    (Elasticsearch) search engine. Override ``get_highlight_options()``
+    for other engines.
     """
 
-    def filter_queryset(self, request, queryset, view):
-        queryset = super(HaystackHighlightFilter, self).filter_queryset(request, queryset, view)
-        if self.get_request_filters(request) and isinstance(queryset, SearchQuerySet):
-            queryset = queryset.highlight()
+    highlight_fields = None
+    highlight_fragment_size = None
+    highlight_number_of_fragments = None
+
+    def get_highlight_options(self, queryset):
+        """
+        Returns the keyword arguments to pass to ``SearchQuerySet.highlight()``.
+        """
+        field_options = {}
+        if self.highlight_fragment_size is not None:
+            field_options["fragment_size"] = self.highlight_fragment_size
+        if self.highlight_number_of_fragments is not None:
+            field_options["number_of_fragments"] = self.highlight_number_of_fragments
+
+        if not (self.highlight_fields or field_options):
+            return {}
+
+        # The search engine stores the highlighting for the document field
+        # in ``SearchResult.highlighted``, so it's the default.
+        fields = self.highlight_fields or [
+            connections[queryset.query.backend.connection_alias].get_unified_index().document_field
+        ]
+        return {"fields": dict((field, dict(field_options, store="yes")) for field in fields)}
+
+    def apply_filters(self, queryset, applicable_filters=None, applicable_exclusions=None):
+        queryset = super(HaystackHighlightFilter, self).apply_filters(
+            queryset, applicable_filters, applicable_exclusions)
+        if applicable_filters and isinstance(queryset, SearchQuerySet):
+            queryset = queryset.highlight(**self.get_highlight_options(queryset))
         return queryset
 
 
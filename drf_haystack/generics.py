@@ -2,16 +2,15 @@
 
 from __future__ import absolute_import, unicode_literals
 
-import six
-
-from django.contrib.contenttypes.models import ContentType
-from django.http import Http404
+from django.http import Http404, HttpResponse
 
 from haystack.backends import SQ
 from haystack.query import SearchQuerySet
 from rest_framework.generics import GenericAPIView
 
+from drf_haystack.cache import get_model_versions, get_or_set, make_cache_key
 from drf_haystack.filters import HaystackFilter
+from drf_haystack.utils import index_model_resolver
 
 
 class HaystackGenericAPIView(GenericAPIView):
@@ -31,6 +30,13 @@ class HaystackGenericAPIView(GenericAPIView):
     document_uid_field = "id"
     lookup_sep = ","
 
+    # Set to True if ``document_uid_field`` holds the search engine's own
+    # unique identifier for a document, such as haystack's ``django_id``
+    # field on a view searching a single model. Instead of a regular query,
+    # ``get_object()`` will then do an exact lookup on that field and only
+    # ask the backend for a single document.
+    native_document_lookup = False
+
     # If set to False, DB lookups are done on a per-object basis,
     # resulting in in many individual trips to the database. If True,
     # the SearchQuerySet will group similar objects into a single query.
@@ -38,6 +44,12 @@ class HaystackGenericAPIView(GenericAPIView):
 
     filter_backends = [HaystackFilter]
 
+    # Set to a number of seconds in order to cache the rendered responses of
+    # the ``list()``, ``retrieve()`` and ``facets()`` actions in the Django cache.
+    # Entries are keyed on the request url and the version of the index models,
+    # see ``drf_haystack.cache`` for how to evict them when the models change.
+    cache_timeout = None
+
     def get_queryset(self, index_models=[]):
         """
         Get the list of items for this view.
@@ -71,13 +83,11 @@ class HaystackGenericAPIView(GenericAPIView):
         """
         queryset = self.get_queryset()
         if "model" in self.request.query_params:
-            try:
-                app_label, model = map(six.text_type.lower, self.request.query_params["model"].split(".", 1))
-                ctype = ContentType.objects.get(app_label=app_label, model=model)
-                queryset = self.get_queryset(index_models=[ctype.model_class()])
-            except (ValueError, ContentType.DoesNotExist):
+            model = index_model_resolver.resolve(self.request.query_params["model"])
+            if model is None:
                 raise Http404("Could not find any models matching '%s'. Make sure to use a valid "
                               "'app_label.model' name for the 'model' query parameter." % self.request.query_params["model"])
+            queryset = self.get_queryset(index_models=[model])
 
         lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
         if lookup_url_kwarg not in self.kwargs:
@@ -86,15 +96,66 @@ class HaystackGenericAPIView(GenericAPIView):
                 "named '%s'. Fix your URL conf, or set the `.lookup_field` "
                 "attribute on the view correctly." % (self.__class__.__name__, lookup_url_kwarg)
             )
-        queryset = queryset.filter(self.query_object((self.document_uid_field, self.kwargs[lookup_url_kwarg])))
-        count = queryset.count()
-        if count == 1:
-            return queryset[0]
-        elif count > 1:
+        lookup_value = self.kwargs[lookup_url_kwarg]
+        if self.native_document_lookup:
+            queryset = queryset.filter(self.query_object(("%s__exact" % self.document_uid_field, lookup_value)))
+            results = queryset[:1]
+        else:
+            # Two results are enough to tell a unique match from multiple matches,
+            # and fetching them doesn't require a separate count query.
+            queryset = queryset.filter(self.query_object((self.document_uid_field, lookup_value)))
+            results = queryset[:2]
+
+        if len(results) == 1:
+            return results[0]
+        elif len(results) > 1:
             raise Http404("Multiple results matches the given query. Expected a single result.")
 
         raise Http404("No result matches the given query.")
 
+    def get_cache_models(self):
+        """
+        Returns the models which the cached responses of this view depends on.
+        """
+        return list(self.index_models) or sorted(
+            index_model_resolver.get_indexed_models().values(), key=lambda model: model._meta.label_lower)
+
+    def get_response_cache_key(self, request, *args, **kwargs):
+        """
+        Returns the cache key for the response to ``request``.
+        Override this if responses depends on anything but the request url
+        (such as the current user).
+        """
+        query_params = sorted((key, tuple(values)) for key, values in request.query_params.lists())
+        models = self.get_cache_models()
+        return make_cache_key(
+            "%s.%s" % (self.__class__.__module__, self.__class__.__name__), getattr(self, "action", None),
+            request.build_absolute_uri(request.path), query_params, sorted(kwargs.items()),
+            request.accepted_media_type, [model._meta.label_lower for model in models], get_model_versions(models)
+        )
+
+    def get_cached_response(self, request, handler, *args, **kwargs):
+        """
+        Returns the cached response for ``request``, or calls the ``handler``
+        and caches the (successful) response if ``cache_timeout`` is set.
+        """
+        if self.cache_timeout is None or request.method not in ("GET", "HEAD"):
+            return handler(request, *args, **kwargs)
+
+        def render_response():
+            response = self.finalize_response(request, handler(request, *args, **kwargs), *args, **kwargs)
+            response.render()
+            return response.status_code, list(response.items()), response.content
+
+        status, headers, content = get_or_set(
+            self.get_response_cache_key(request, *args, **kwargs), render_response,
+            timeout=self.cache_timeout, is_cacheable=lambda value: value[0] == 200
+        )
+        response = HttpResponse(content, status=status)
+        for header, value in headers:
+            response[header] = value
+        return response
+
     def filter_queryset(self, queryset):
         queryset = super(HaystackGenericAPIView, self).filter_queryset(queryset)
         
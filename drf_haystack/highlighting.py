@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, unicode_literals
+
+from itertools import chain
+
+from haystack.utils.highlighting import Highlighter
+
+
+class FastHighlighter(Highlighter):
+    """
+    A drop-in replacement for the haystack ``Highlighter`` which renders the
+    exact same output, only faster.
+
+    The densest window of query words is found in linear time, instead of
+    comparing every found word with all the following ones, and the html is
+    rendered by joining the chunks instead of repeated string concatenation.
+    """
+
+    def __init__(self, query, **kwargs):
+        super(FastHighlighter, self).__init__(query, **kwargs)
+
+        if self.css_class:
+            self.hl_start = '<%s class="%s">' % (self.html_tag, self.css_class)
+        else:
+            self.hl_start = "<%s>" % self.html_tag
+        self.hl_end = "</%s>" % self.html_tag
+
+    def find_window(self, highlight_locations):
+        best_start = 0
+        best_end = self.max_length
+
+        words_found = sorted(chain.from_iterable(highlight_locations.values()))
+        if not words_found:
+            return (best_start, best_end)
+
+        if len(words_found) == 1:
+            return (words_found[0], words_found[0] + self.max_length)
+
+        if words_found[0] > self.max_length:
+            best_start = words_found[0]
+            best_end = best_start + self.max_length
+
+        # For each word, count how many of the following words fits within
+        # ``max_length`` from it, and pick the first word with the highest
+        # count (which needs to be at least one other word).
+        highest_density = 0
+        end = 0
+        for count, start in enumerate(words_found):
+            end = max(end, count + 1)
+            while end < len(words_found) and words_found[end] - start < self.max_length:
+                end += 1
+
+            density = end - count
+            if density > 1 and density > highest_density:
+                best_start = start
+                best_end = start + self.max_length
+                highest_density = density
+
+        return (best_start, best_end)
+
+    def render_html(self, highlight_locations=None, start_offset=None, end_offset=None):
+        # Start by chopping the block down to the proper window.
+        text = self.text_block[start_offset:end_offset]
+
+        loc_to_term = sorted(
+            (location - start_offset, term)
+            for term, locations in highlight_locations.items()
+            for location in locations
+        )
+
+        chunks = []
+        matched_so_far = 0
+        prev_end = 0
+
+        for cur, cur_str in loc_to_term:
+            # This can be in a different case than cur_str
+            actual_term = text[cur:cur + len(cur_str)]
+
+            # Handle incorrect highlight_locations by first checking for the term
+            if actual_term.lower() == cur_str:
+                if cur < prev_end:
+                    continue
+
+                chunks.extend((text[prev_end:cur], self.hl_start, actual_term, self.hl_end))
+                prev_end = cur + len(cur_str)
+
+                # Keep track of how far we've copied so far, for the last step
+                matched_so_far = cur + len(actual_term)
+
+        # Don't forget the chunk after the last term
+        chunks.append(text[matched_so_far:])
+        highlighted_chunk = "".join(chunks)
+
+        if start_offset > 0:
+            highlighted_chunk = "...%s" % highlighted_chunk
+
+        if end_offset < len(self.text_block):
+            highlighted_chunk = "%s..." % highlighted_chunk
+
+        return highlighted_chunk
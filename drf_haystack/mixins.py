@@ -2,10 +2,27 @@
 
 from __future__ import absolute_import, unicode_literals
 
+import csv
+import json
+import re
+from collections import OrderedDict
+from concurrent.futures import TimeoutError
+from copy import copy
+
+from django.http import QueryDict, StreamingHttpResponse
+
+from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 
+from drf_haystack.cache import get_model_versions, get_or_set, get_query_signature, make_cache_key
 from drf_haystack.filters import HaystackFacetFilter
+from drf_haystack.multisearch import multi_search
+from drf_haystack.pagination import HaystackCursorPagination, get_page_slice
+from drf_haystack.utils import run_concurrently
 
 
 class MoreLikeThisMixin(object):
@@ -33,6 +50,12 @@ class MoreLikeThisMixin(object):
         return Response(serializer.data)
 
 
+class SearchTimeout(APIException):
+    status_code = status.HTTP_504_GATEWAY_TIMEOUT
+    default_detail = "The search engine took too long to respond."
+    default_code = "search_timeout"
+
+
 class FacetMixin(object):
     """
     Mixin class for supporting faceting on an API View.
@@ -43,12 +66,30 @@ class FacetMixin(object):
     facet_objects_serializer_class = None
     facet_query_params_text = 'selected_facets'
 
+    # Set ``facet_cache_timeout`` to a number of seconds in order to cache the
+    # facet counts, and use ``facet_cache_timeouts`` to set a different timeout
+    # for some of the facet fields, ie. ``{"created": 3600}``.
+    facet_cache_timeout = None
+    facet_cache_timeouts = {}
+
+    # Set ``facet_concurrent`` to True in order to fetch the facet counts and the
+    # objects with two concurrent queries, and ``facet_timeout`` to the number of
+    # seconds to wait for them before responding with a ``504 Gateway Timeout``.
+    facet_concurrent = False
+    facet_timeout = None
+
     @action(detail=False, methods=["get"], url_path="facets")
     def facets(self, request):
         """
         Sets up a list route for ``faceted`` results.
         This will add ie ^search/facets/$ to your existing ^search pattern.
         """
+        return self.get_cached_response(request, self.get_facets_response)
+
+    def get_facets_response(self, request):
+        """
+        Returns the (uncached) response for the ``facets()`` action.
+        """
         queryset = self.filter_facet_queryset(self.get_queryset())
 
         for facet in request.query_params.getlist(self.facet_query_params_text):
@@ -60,9 +101,84 @@ class FacetMixin(object):
             if value:
                 queryset = queryset.narrow('%s:"%s"' % (field, queryset.query.clean(value)))
 
-        serializer = self.get_facet_serializer(queryset.facet_counts(), objects=queryset, many=False)
+        objects = self.get_facet_objects_queryset(queryset)
+        serialize_objects = self.get_facet_serializer_class().serialize_objects
+
+        if serialize_objects and self.facet_concurrent:
+            try:
+                facet_counts, _ = run_concurrently([
+                    lambda: self.get_facet_counts(queryset),
+                    lambda: self.prefetch_facet_objects(objects),
+                ], timeout=self.facet_timeout)
+            except TimeoutError:
+                raise SearchTimeout()
+        else:
+            if serialize_objects:
+                self.prefetch_facet_objects(objects)
+            facet_counts = self.get_facet_counts(queryset)
+
+        serializer = self.get_facet_serializer(facet_counts, objects=objects, many=False)
         return Response(serializer.data)
 
+    def prefetch_facet_objects(self, queryset):
+        """
+        Fetches the objects which are serialized along with the facets into the result
+        cache of ``queryset``. The facet counts and the total count are returned by the
+        same search engine query, so the whole response only needs a single query.
+        """
+        bounds = self.get_facet_objects_slice()
+        if bounds is not None:
+            start, stop = bounds
+            queryset[start:stop]
+
+    def get_facet_objects_slice(self):
+        """
+        Returns the ``(start, stop)`` slice of the objects the paginator will return,
+        or ``None`` if it can't be determined before paginating.
+        """
+        return get_page_slice(self.paginator, self.request)
+
+    def get_facet_counts(self, queryset):
+        """
+        Returns the facet counts for the queryset. If facet caching is enabled,
+        they're cached on the effective query (filters, narrowing and facet
+        options), so they're shared by all pages and page sizes of the objects.
+        """
+        if self.facet_cache_timeout is None and not self.facet_cache_timeouts:
+            return queryset.facet_counts()
+
+        models = sorted(queryset.query.models, key=lambda model: model._meta.label_lower) or self.get_cache_models()
+        cache_key = make_cache_key("facet_counts", get_query_signature(queryset), get_model_versions(models))
+        return get_or_set(
+            cache_key, queryset.facet_counts, timeout=self.get_facet_cache_timeout,
+            is_cacheable=lambda facet_counts: self.get_facet_cache_timeout(facet_counts) is not None
+        )
+
+    def get_facet_cache_timeout(self, facet_counts):
+        """
+        Returns the number of seconds to cache the ``facet_counts`` for, which
+        is the shortest timeout of the facet fields in it.
+        """
+        fields = [field for facets in facet_counts.values() if isinstance(facets, dict) for field in facets]
+        timeouts = [self.facet_cache_timeouts.get(field, self.facet_cache_timeout) for field in fields]
+        timeouts = [timeout for timeout in timeouts if timeout is not None]
+        return min(timeouts) if timeouts else self.facet_cache_timeout
+
+    def get_facet_objects_queryset(self, queryset):
+        """
+        Returns the queryset for the ``objects`` of the facet response. When the facet counts
+        are cached (or fetched concurrently), the faceting is removed from it so that paging
+        through the objects doesn't make the search engine compute the facets again.
+        """
+        if not self.facet_concurrent and self.facet_cache_timeout is None and not self.facet_cache_timeouts:
+            return queryset
+
+        queryset = queryset._clone()
+        queryset.query.facets = {}
+        queryset.query.date_facets = {}
+        queryset.query.query_facets = []
+        return queryset
+
     def filter_facet_queryset(self, queryset):
         """
         Given a search queryset, filter it with whichever facet filter backends
@@ -120,3 +236,201 @@ class FacetMixin(object):
         ``self.facet_objects_serializer_class`` is set.
         """
         return self.facet_objects_serializer_class or super(FacetMixin, self).get_serializer_class()
+
+
+class _Echo(object):
+    """
+    A file-like object which returns what's written to it,
+    for streaming the rows of a ``csv.writer``.
+    """
+
+    def write(self, value):
+        return value
+
+
+class ExportMixin(object):
+    """
+    Mixin class for exporting all the results of a search on an API View.
+    """
+
+    export_chunk_size = 1000
+    export_filename = "export"
+    export_format_query_param = "export_format"
+    export_content_types = {
+        "ndjson": "application/x-ndjson",
+        "csv": "text/csv",
+    }
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """
+        Sets up a list route which streams all the (filtered) results,
+        serialized as newline delimited JSON or CSV.
+        This will add ie. ^search/export/$ to your existing ^search pattern.
+        """
+        export_format = request.query_params.get(self.export_format_query_param, "ndjson")
+        if export_format not in self.export_content_types:
+            raise NotFound("Unsupported export format '%s'." % export_format)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = (row for chunk in self.iter_export_chunks(queryset) for row in self.serialize_export_chunk(chunk))
+        renderer = getattr(self, "render_export_%s" % export_format)
+
+        response = StreamingHttpResponse(renderer(rows), content_type=self.export_content_types[export_format])
+        response["Content-Disposition"] = 'attachment; filename="%s.%s"' % (self.export_filename, export_format)
+        return response
+
+    def iter_export_chunks(self, queryset):
+        """
+        Yields all the results of the queryset in chunks of ``export_chunk_size``.
+        Each chunk is fetched by a new query selecting the results sorted after the
+        previous chunk (see ``HaystackCursorPagination``), so neither the memory use
+        nor the cost of a query grows with the number of results exported.
+        """
+        paginator = HaystackCursorPagination()
+        ordering = paginator.get_ordering(self.request, queryset, self)
+
+        queryset = queryset._clone()
+        queryset.query.clear_order_by()
+        queryset = queryset.order_by(*ordering)
+
+        chunk_queryset = queryset.all()
+        while True:
+            # Results without a value for every ordering field can't be positioned, and are left out.
+            results = chunk_queryset[:self.export_chunk_size]
+            chunk = [result for result in results if paginator.has_position(result, ordering)]
+            if chunk:
+                yield chunk
+
+            if not chunk or len(results) < self.export_chunk_size:
+                return
+
+            values = [paginator.get_position_value(chunk[-1], field.lstrip("-")) for field in ordering]
+            chunk_queryset = queryset.filter(paginator.get_position_query(ordering, values))
+
+    def serialize_export_chunk(self, chunk):
+        """
+        Returns the serialized data for a chunk of results.
+        """
+        return self.get_serializer(chunk, many=True).data
+
+    def render_export_ndjson(self, rows):
+        for row in rows:
+            yield json.dumps(row, cls=JSONEncoder, ensure_ascii=False) + "\n"
+
+    def render_export_csv(self, rows):
+        writer = None
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(_Echo(), fieldnames=list(row), extrasaction="ignore")
+                yield writer.writeheader()
+            yield writer.writerow(row)
+
+
+class MultiSearchMixin(object):
+    """
+    Mixin class for running several searches with a single request on an API View.
+    """
+
+    multi_search_max_size = 10
+
+    @action(detail=False, methods=["post"], url_path="batch")
+    def batch(self, request):
+        """
+        Sets up a list route which runs a list of searches, each one given as an
+        object with the query parameters for the search, and returns a list with
+        the status and data of the response for each of them.
+        This will add ie. ^search/batch/$ to your existing ^search pattern.
+
+        The searches are sent to the search engine as a single multi-search
+        request if the backend supports it, or else concurrently.
+        """
+        views = [self.get_batch_view(params) for params in self.get_batch_params(request)]
+        querysets = [self.get_batch_queryset(view) for view in views]
+
+        searches = []
+        for view, queryset in zip(views, querysets):
+            bounds = get_page_slice(view.paginator, view.request)
+            if bounds is not None and not isinstance(queryset, Response):
+                searches.append((queryset, bounds[0], bounds[1]))
+        multi_search(searches)
+
+        responses = [
+            queryset if isinstance(queryset, Response) else self.get_batch_response(view, queryset)
+            for view, queryset in zip(views, querysets)
+        ]
+        return Response([
+            OrderedDict([("status", response.status_code), ("data", response.data)])
+            for response in responses
+        ])
+
+    def get_batch_params(self, request):
+        """
+        Returns the list of query parameters for each of the searches.
+        """
+        data = request.data
+        if not isinstance(data, list) or not all(isinstance(params, dict) for params in data):
+            raise ValidationError("Expected a list of objects with query parameters.")
+        if len(data) > self.multi_search_max_size:
+            raise ValidationError("Expected at most %d searches." % self.multi_search_max_size)
+        return data
+
+    def get_batch_view(self, params):
+        """
+        Returns a copy of the view, for running the ``list()`` action with the query ``params``.
+        """
+        http_request = copy(self.request._request)
+        http_request.GET = QueryDict(mutable=True)
+        for key, value in params.items():
+            http_request.GET.setlist(key, [str(item) for item in value] if isinstance(value, list) else [str(value)])
+        http_request.GET._mutable = False
+
+        # Make the pagination links point at the list route with the query params of the search.
+        suffix = re.compile(r"%s/?$" % re.escape(self.batch.url_path))
+        http_request.path = suffix.sub("", http_request.path)
+        http_request.path_info = suffix.sub("", http_request.path_info)
+        http_request.META = dict(http_request.META, QUERY_STRING=http_request.GET.urlencode())
+
+        request = Request(
+            http_request,
+            parsers=self.request.parsers,
+            authenticators=self.request.authenticators,
+            negotiator=self.request.negotiator,
+            parser_context=self.request.parser_context
+        )
+        request.user = self.request.user
+        request.auth = self.request.auth
+
+        view = copy(self)
+        view.__dict__.pop("_paginator", None)
+        view.request = request
+        view.action = "list"
+        return view
+
+    def get_batch_queryset(self, view):
+        """
+        Returns the filtered queryset of a (copied) view, or the error
+        response if its query parameters are invalid.
+        """
+        try:
+            return view.filter_queryset(view.get_queryset())
+        except ValueError as exc:
+            # The query builders raise ValueError for query parameters they can't parse.
+            return view.handle_exception(ValidationError(str(exc)))
+        except APIException as exc:
+            return view.handle_exception(exc)
+
+    def get_batch_response(self, view, queryset):
+        """
+        Returns the ``list()`` response of a (copied) view for the queryset.
+        """
+        try:
+            page = view.paginate_queryset(queryset)
+            if page is not None:
+                serializer = view.get_serializer(page, many=True)
+                return view.get_paginated_response(serializer.data)
+
+            serializer = view.get_serializer(queryset, many=True)
+            return Response(serializer.data)
+        except APIException as exc:
+            return view.handle_exception(exc)
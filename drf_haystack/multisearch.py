@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, unicode_literals
+
+from collections import OrderedDict
+from functools import partial
+
+from haystack import connections
+from haystack.models import SearchResult
+
+from drf_haystack.utils import run_concurrently
+
+try:
+    from elasticsearch import TransportError
+    from haystack.backends.elasticsearch_backend import ElasticsearchSearchBackend
+except ImportError:  # The elasticsearch client is not installed
+    ElasticsearchSearchBackend = None
+
+
+def supports_multi_search(backend):
+    """
+    Returns ``True`` if several queries can be sent to the ``backend`` in a single request.
+    """
+    return ElasticsearchSearchBackend is not None and isinstance(backend, ElasticsearchSearchBackend)
+
+
+def multi_search(searches):
+    """
+    Fetches the results for a list of ``(queryset, start, stop)`` searches into the
+    result cache of each queryset, so that slicing them with ``[start:stop]``,
+    ``count()`` and ``facet_counts()`` doesn't hit the search engine again.
+
+    Searches on a backend which supports it are sent in a single multi-search
+    request per connection, the others are run concurrently.
+    """
+    grouped = OrderedDict()
+    others = []
+    for search in searches:
+        backend = search[0].query.backend
+        if supports_multi_search(backend):
+            grouped.setdefault(search[0].query._using, []).append(search)
+        else:
+            others.append(search)
+
+    funcs = [partial(_multi_search, searches) for searches in grouped.values()]
+    funcs += [partial(queryset.__getitem__, slice(start, stop)) for queryset, start, stop in others]
+    if funcs:
+        run_concurrently(funcs)
+
+
+def _multi_search(searches):
+    backend = connections[searches[0][0].query._using].get_backend()
+    if not backend.setup_complete:
+        backend.setup()
+
+    body = []
+    params = []
+    for queryset, start, stop in searches:
+        query = queryset.query
+        query._reset()
+        query.set_limits(start, stop)
+
+        kwargs = query.build_params()
+        search_kwargs = backend.build_search_kwargs(query.build_query(), **kwargs)
+        search_kwargs["from"] = query.start_offset
+        if query.end_offset is not None and query.end_offset > query.start_offset:
+            search_kwargs["size"] = query.end_offset - query.start_offset
+
+        body.extend([{}, search_kwargs])
+        params.append((kwargs, any("_geo_distance" in order for order in search_kwargs.get("sort", []))))
+
+    try:
+        # django-haystack < 3 doesn't have ``_get_doc_type_option()``, nor does it pass a document type.
+        doc_type_option = getattr(backend, "_get_doc_type_option", dict)()
+        responses = backend.conn.msearch(body=body, index=backend.index_name, **doc_type_option)
+    except TransportError:
+        responses = {}
+
+    responses = responses.get("responses") or [{"error": True}] * len(searches)
+    for (queryset, start, stop), (kwargs, geo_sort), raw_results in zip(searches, params, responses):
+        if "error" in raw_results:
+            # Let haystack run the query again on its own, and deal with the error.
+            queryset._result_cache = []
+            queryset[start:stop]
+            continue
+
+        results = backend._process_results(
+            raw_results,
+            highlight=kwargs.get("highlight"),
+            result_class=kwargs.get("result_class", SearchResult),
+            distance_point=kwargs.get("distance_point"),
+            geo_sort=geo_sort,
+        )
+        fill_result_cache(queryset, start, results)
+
+
+def fill_result_cache(queryset, start, results):
+    """
+    Stores the backend ``results`` (as returned by ``backend.search()``) for
+    the slice of the ``queryset`` beginning at ``start``, like the
+    ``SearchQuerySet`` does when it runs the query itself.
+    """
+    query = queryset.query
+    query._results = results.get("results", [])
+    query._hit_count = results.get("hits", 0)
+    query._facet_counts = query.post_process_facets(results)
+    query._spelling_suggestion = results.get("spelling_suggestion", None)
+
+    queryset._result_cache = [None] * query._hit_count
+    to_cache = queryset.post_process_results(query._results)
+    queryset._result_cache[start:start + len(to_cache)] = to_cache
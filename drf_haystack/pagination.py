@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, unicode_literals
+
+import json
+from collections import OrderedDict
+
+import six
+
+from django.core.paginator import Paginator as DjangoPaginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.functional import cached_property
+
+from haystack.backends import SQ
+from haystack.constants import DJANGO_CT, DJANGO_ID, ID, ITERATOR_LOAD_PER_QUERY
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, LimitOffsetPagination, PageNumberPagination
+
+from drf_haystack.cache import get_cache, get_model_versions, get_or_set, get_query_signature, make_cache_key
+
+
+def get_page_slice(paginator, request):
+    """
+    Returns the ``(start, stop)`` slice of the results which the ``paginator``
+    will return for the ``request``, or ``None`` if it can't be determined
+    before paginating. Supports the ``PageNumberPagination`` and
+    ``LimitOffsetPagination`` classes, and no pagination at all.
+    """
+    if paginator is None:
+        return 0, ITERATOR_LOAD_PER_QUERY
+
+    if hasattr(paginator, "page_query_param") and hasattr(paginator, "get_page_size"):
+        page_size = paginator.get_page_size(request)
+        if not page_size:
+            return 0, ITERATOR_LOAD_PER_QUERY
+        try:
+            page_number = int(request.query_params.get(paginator.page_query_param, 1))
+        except (TypeError, ValueError):
+            return None
+        if page_number < 1:
+            return None
+        return (page_number - 1) * page_size, page_number * page_size
+
+    if hasattr(paginator, "get_limit") and hasattr(paginator, "get_offset"):
+        limit = paginator.get_limit(request)
+        if limit is None:
+            return 0, ITERATOR_LOAD_PER_QUERY
+        offset = paginator.get_offset(request)
+        return offset, offset + limit
+
+    return None
+
+
+class CappedPaginator(DjangoPaginator):
+    """
+    A Django ``Paginator`` which counts at most ``count_ceiling`` objects.
+    """
+
+    def __init__(self, object_list, per_page, count_ceiling=None, count_func=None, **kwargs):
+        super(CappedPaginator, self).__init__(object_list, per_page, **kwargs)
+        self.count_ceiling = count_ceiling
+        self.count_func = count_func
+        self.count_capped = False
+
+    @cached_property
+    def count(self):
+        count = self.count_func() if self.count_func else DjangoPaginator.count.func(self)
+        if self.count_ceiling is not None and count > self.count_ceiling:
+            self.count_capped = True
+            return self.count_ceiling
+        return count
+
+
+class HaystackPaginationMixin(object):
+    """
+    Pagination mixin which fetches the page of results before counting them, so
+    that the count comes with the same search engine query as the results instead
+    of requiring a query of its own.
+
+    Set ``count_ceiling`` in order to never report more than that many results (and
+    no pages beyond them), with ``count_capped`` in the response telling whether
+    there are more. This is useful since deep pages are expensive (and refused by
+    Elasticsearch beyond its ``index.max_result_window``, 10000 by default), and
+    Elasticsearch 7 and later doesn't count exactly beyond 10000 hits anyway.
+
+    Set ``count_cache_timeout`` to a number of seconds in order to cache the count on
+    the effective query (the filters, but not the page), so that paging through the
+    results keeps the same count, and page numbers like "last" or those beyond the
+    end are resolved without counting the results again.
+    """
+
+    count_ceiling = None
+    count_cache_timeout = None
+    count_cache_key = None
+
+    def prefetch_page(self, queryset, request, view=None):
+        self.count_cache_key = self.get_count_cache_key(queryset, view)
+        if self.count_cache_key is not None and get_cache().get(self.count_cache_key) is not None:
+            # We know the count already, and may not need the page at all.
+            return
+
+        bounds = get_page_slice(self, request)
+        if bounds is not None and hasattr(queryset, "query"):
+            start, stop = bounds
+            if self.count_ceiling is not None:
+                if start >= self.count_ceiling:
+                    # There's no such page, so only the count is needed.
+                    return
+                stop = min(stop, self.count_ceiling)
+            queryset[start:stop]
+
+    def get_count_cache_key(self, queryset, view=None):
+        """
+        Returns the cache key for the count of the ``queryset``, or ``None`` if it
+        shouldn't be cached.
+        """
+        if self.count_cache_timeout is None or not hasattr(queryset, "query"):
+            return None
+
+        models = sorted(queryset.query.models, key=lambda model: model._meta.label_lower)
+        if not models and hasattr(view, "get_cache_models"):
+            models = view.get_cache_models()
+        return make_cache_key("count", get_query_signature(queryset), get_model_versions(models))
+
+    def get_queryset_count(self, queryset):
+        """
+        Returns the number of results in the ``queryset``.
+        """
+        if self.count_cache_key is not None:
+            return get_or_set(self.count_cache_key, queryset.count, timeout=self.count_cache_timeout)
+
+        try:
+            return queryset.count()
+        except (AttributeError, TypeError):
+            return len(queryset)
+
+    def get_paginated_response(self, data):
+        response = super(HaystackPaginationMixin, self).get_paginated_response(data)
+        if self.count_ceiling is not None:
+            response.data = OrderedDict(
+                [("count", response.data.pop("count")), ("count_capped", self.is_count_capped())] +
+                list(response.data.items())
+            )
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super(HaystackPaginationMixin, self).get_paginated_response_schema(schema)
+        if self.count_ceiling is not None:
+            response_schema["properties"]["count_capped"] = {"type": "boolean", "example": False}
+        return response_schema
+
+
+class HaystackPageNumberPagination(HaystackPaginationMixin, PageNumberPagination):
+    """
+    A ``PageNumberPagination`` which counts the results with the same query as
+    it fetches the page, see ``HaystackPaginationMixin``.
+    """
+
+    def django_paginator_class(self, object_list, per_page):
+        return CappedPaginator(
+            object_list, per_page, count_ceiling=self.count_ceiling,
+            count_func=lambda: self.get_queryset_count(object_list)
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.prefetch_page(queryset, request, view)
+        return super(HaystackPageNumberPagination, self).paginate_queryset(queryset, request, view)
+
+    def is_count_capped(self):
+        return self.page.paginator.count_capped
+
+
+class HaystackLimitOffsetPagination(HaystackPaginationMixin, LimitOffsetPagination):
+    """
+    A ``LimitOffsetPagination`` which counts the results with the same query as
+    it fetches the page, see ``HaystackPaginationMixin``.
+    """
+
+    count_capped = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.prefetch_page(queryset, request, view)
+        if self.count_ceiling is None:
+            return super(HaystackLimitOffsetPagination, self).paginate_queryset(queryset, request, view)
+
+        # Like ``LimitOffsetPagination.paginate_queryset()``, but never returns results beyond the ceiling.
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = self.get_count(queryset)
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if self.offset >= self.count:
+            return []
+        return list(queryset[self.offset:min(self.offset + self.limit, self.count)])
+
+    def get_count(self, queryset):
+        count = self.get_queryset_count(queryset)
+        self.count_capped = self.count_ceiling is not None and count > self.count_ceiling
+        return self.count_ceiling if self.count_capped else count
+
+    def is_count_capped(self):
+        return self.count_capped
+
+
+class HaystackCursorPagination(CursorPagination):
+    """
+    Cursor pagination for a ``SearchQuerySet``.
+
+    Instead of an offset, the cursor holds the sort values of the last result
+    on the page, and the next page is fetched by filtering on the results sorted
+    after it (like Elasticsearch's ``search_after``), so fetching any page costs
+    the same as fetching the first one.
+
+    The results are sorted by the ordering of the queryset (ie. from the
+    ``HaystackOrderingFilter``), or else by ``ordering``, with the view's
+    ``document_uid_field`` appended as a tie-breaker. All these fields must be
+    sortable and support exact lookups in the search engine, and results which
+    don't have a value for all of them are left out.
+    """
+
+    ordering = ()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+
+        queryset = queryset._clone()
+        queryset.query.clear_order_by()
+        queryset = queryset.order_by(*ordering)
+
+        if self.cursor is not None and self.cursor.position is not None:
+            queryset = queryset.filter(self.get_position_query(ordering, self.decode_position(self.cursor.position)))
+
+        # Fetch an extra result in order to determine if there's another page. Results without
+        # a value for every ordering field can't be positioned, and are left out (like the
+        # queries for the following pages leave them out).
+        results = [result for result in queryset[:self.page_size + 1] if self.has_position(result, self.ordering)]
+        self.page = results[:self.page_size]
+        has_following_position = len(results) > len(self.page)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = self.cursor is not None
+
+        if self.page:
+            self.next_position = self.get_position(self.page[-1], self.ordering)
+            self.previous_position = self.get_position(self.page[0], self.ordering)
+        else:
+            # We're past either end of the results, so link back to the cursor position.
+            self.next_position = self.previous_position = self.cursor.position if self.cursor else None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Returns the ordering of the results, which always ends with the
+        ``document_uid_field`` so that every result has a unique position.
+        """
+        ordering = list(queryset.query.order_by)
+        if not ordering:
+            ordering = [self.ordering] if isinstance(self.ordering, six.string_types) else list(self.ordering)
+
+        uid_field = getattr(view, "document_uid_field", ID)
+        if not any(field.lstrip("-") == uid_field for field in ordering):
+            ordering.append(uid_field)
+        return tuple(ordering)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.next_position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.previous_position))
+
+    def get_position(self, result, ordering):
+        """
+        Returns the encoded sort values of a ``result``.
+        """
+        values = [self.get_position_value(result, field.lstrip("-")) for field in ordering]
+        return json.dumps(values, cls=DjangoJSONEncoder, separators=(",", ":"))
+
+    def has_position(self, result, ordering):
+        """
+        Returns ``True`` if the ``result`` has a value for every field of the ``ordering``.
+        """
+        return all(self.get_position_value(result, field.lstrip("-")) is not None for field in ordering)
+
+    def decode_position(self, position):
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def get_position_value(self, result, field_name):
+        """
+        Returns the value of the ``field_name`` index field for a ``result``,
+        or ``None`` if it doesn't have one.
+        """
+        if isinstance(result, dict):
+            return result.get(field_name)
+        if field_name == ID:
+            return "%s.%s.%s" % (result.app_label, result.model_name, result.pk)
+        if field_name == DJANGO_ID:
+            return result.pk
+        if field_name == DJANGO_CT:
+            return "%s.%s" % (result.app_label, result.model_name)
+        return getattr(result, field_name, None)
+
+    def get_position_query(self, ordering, values):
+        """
+        Returns a query for the results sorted after the ``values`` by ``ordering``,
+        ie. ``a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)``.
+        """
+        query = None
+        exact = None
+        for field, value in zip(ordering, values):
+            field_name = field.lstrip("-")
+            lookup = "%s__lt" if field.startswith("-") else "%s__gt"
+            clause = SQ(**{lookup % field_name: value})
+            if exact is not None:
+                clause = exact & clause
+            query = clause if query is None else query | clause
+
+            condition = SQ(**{"%s__exact" % field_name: value})
+            exact = condition if exact is None else exact & condition
+        return query
+
+
+def _reverse_ordering(ordering):
+    return tuple(field[1:] if field.startswith("-") else "-%s" % field for field in ordering)
@@ -5,14 +5,93 @@ from __future__ import absolute_import, unicode_literals
 import operator
 import six
 import warnings
+from collections import namedtuple
+from copy import copy
 from itertools import chain
 
 
 from six.moves import zip
 from dateutil import parser
+from django.utils import tree
 
 from drf_haystack import constants
-from drf_haystack.utils import merge_dict
+from drf_haystack.utils import LRUCache, merge_dict
+
+
+def clone_query(query):
+    """
+    Returns a copy of a SQ tree which can be modified without touching the original.
+    (``deepcopy`` can't be used here, since SQ objects created by combining other
+    SQ objects can't be deep-copied.)
+    """
+    if isinstance(query, tuple):
+        return tuple(clone_query(q) for q in query)
+
+    clone = copy(query)
+    clone.children = [clone_query(child) if isinstance(child, tree.Node) else child for child in query.children]
+    return clone
+
+
+FilterParam = namedtuple("FilterParam", ["param", "base_param", "lookups", "excluding"])
+
+
+class FilterFieldLookup(object):
+    """
+    Precomputed lookup of which querystring parameters a serializer allows
+    filtering on, derived once from the serializer's ``Meta`` options
+    (``fields``, ``search_fields``, ``exclude`` and ``field_aliases``).
+
+    ``serializer_class`` may be ``None``, in which case all parameters are allowed.
+    """
+
+    def __init__(self, serializer_class=None, negation_keyword=None):
+        self.serializer_class = serializer_class
+        self.negation_keyword = negation_keyword or constants.DRF_HAYSTACK_NEGATION_KEYWORD
+
+        meta = serializer_class.Meta if serializer_class else None
+        fields = getattr(meta, "fields", None) or []
+        search_fields = getattr(meta, "search_fields", None) or []
+
+        self.allowed = frozenset(chain(fields, search_fields)) if (fields or search_fields) else None
+        self.excluded = frozenset(getattr(meta, "exclude", None) or [])
+        self.field_aliases = dict(getattr(meta, "field_aliases", None) or {})
+        self._params = LRUCache(maxsize=256)
+
+    def is_allowed(self, base_param):
+        """
+        Returns ``True`` if filtering on the (un-aliased) ``base_param`` is allowed.
+        """
+        if self.allowed is not None and base_param not in self.allowed:
+            return False
+        return base_param not in self.excluded
+
+    def resolve(self, param):
+        """
+        Returns a ``FilterParam`` for the querystring ``param``, with negation
+        and aliases resolved, or ``None`` if the parameter is not allowed.
+        """
+        result = self._params.get(param, False)
+        if result is False:
+            result = self._resolve(param)
+            self._params.set(param, result)
+        return result
+
+    def _resolve(self, param):
+        excluding_term = False
+        param_parts = param.split("__")
+        base_param = param_parts[0]  # only test against field without lookup
+        if len(param_parts) > 1 and param_parts[1] == self.negation_keyword:
+            excluding_term = True
+            param = param.replace("__%s" % self.negation_keyword, "")  # haystack wouldn't understand our negation
+
+        if base_param in self.field_aliases:
+            old_base = base_param
+            base_param = self.field_aliases[base_param]
+            param = param.replace(old_base, base_param)  # need to replace the alias
+
+        if self.serializer_class and not self.is_allowed(base_param):
+            return None
+        return FilterParam(param, base_param, tuple(param_parts), excluding_term)
 
 
 class BaseQueryBuilder(object):
@@ -76,8 +155,17 @@ class BoostQueryBuilder(BaseQueryBuilder):
 class FilterQueryBuilder(BaseQueryBuilder):
     """
     Query builder class suitable for doing basic filtering.
+
+    Compiled queries are memoized in ``query_cache``, which is shared by all
+    instances (and subclasses) of the query builder. Its size is controlled
+    by the ``DRF_HAYSTACK_QUERY_CACHE_SIZE`` setting, and setting it to 0
+    disables the cache.
     """
 
+    query_cache = LRUCache(maxsize=constants.DRF_HAYSTACK_QUERY_CACHE_SIZE)
+    field_lookups = LRUCache(maxsize=128)
+    field_lookup_class = FilterFieldLookup
+
     def __init__(self, backend, view):
         super(FilterQueryBuilder, self).__init__(backend, view)
 
@@ -98,7 +186,63 @@ class FilterQueryBuilder(BaseQueryBuilder):
         """
         return self.default_same_param_operator
 
+    def get_field_lookup(self):
+        """
+        Returns the ``FilterFieldLookup`` for the view's serializer class. The lookup
+        is built once per serializer class, and can be reused by custom query builders.
+        """
+        serializer_class = self.view.serializer_class
+        cache_key = (self.field_lookup_class, serializer_class)
+        field_lookup = self.field_lookups.get(cache_key)
+        if field_lookup is None:
+            field_lookup = self.field_lookup_class(serializer_class)
+            self.field_lookups.set(cache_key, field_lookup)
+        return field_lookup
+
+    def get_cache_key(self, filters):
+        """
+        Returns a hashable key identifying the compiled query for ``filters``
+        on the current view, or ``None`` if the query shouldn't be cached.
+        """
+        if self.query_cache.maxsize <= 0:
+            return None
+
+        try:
+            params = tuple(sorted(
+                (param, tuple(value) if isinstance(value, list) else value)
+                for param, value in filters.items()
+            ))
+            cache_key = (
+                self.__class__, self.backend.__class__, self.view.__class__, self.view.serializer_class,
+                self.view.query_object, self.view.lookup_sep, self.default_operator,
+                self.default_same_param_operator, params
+            )
+            hash(cache_key)
+        except TypeError:
+            return None
+        return cache_key
+
     def build_query(self, **filters):
+        """
+        Returns the compiled ``(applicable_filters, applicable_exclusions)`` for the
+        querystring parameters, using the ``query_cache`` if possible. The returned
+        SQ objects are always copies, so it's safe to modify them.
+
+        :param dict[str, list[str]] filters: is an expanded QueryDict or a mapping of keys to a list of
+        parameters.
+        """
+        cache_key = self.get_cache_key(filters)
+        if cache_key is not None:
+            query = self.query_cache.get(cache_key)
+            if query is not None:
+                return clone_query(query)
+
+        query = self.compile_query(**filters)
+        if cache_key is not None:
+            self.query_cache.set(cache_key, clone_query(query))
+        return query
+
+    def compile_query(self, **filters):
         """
         Creates a single SQ filter from querystring parameters that correspond to the SearchIndex fields
         that have been "registered" in `view.fields`.
@@ -113,30 +257,17 @@ class FilterQueryBuilder(BaseQueryBuilder):
         applicable_filters = []
         applicable_exclusions = []
 
+        field_lookup = self.get_field_lookup()
+
         for param, value in filters.items():
-            excluding_term = False
-            param_parts = param.split("__")
-            base_param = param_parts[0]  # only test against field without lookup
-            negation_keyword = constants.DRF_HAYSTACK_NEGATION_KEYWORD
-            if len(param_parts) > 1 and param_parts[1] == negation_keyword:
-                excluding_term = True
-                param = param.replace("__%s" % negation_keyword, "")  # haystack wouldn't understand our negation
-
-            if self.view.serializer_class:
-                if hasattr(self.view.serializer_class.Meta, 'field_aliases'):
-                    old_base = base_param
-                    base_param = self.view.serializer_class.Meta.field_aliases.get(base_param, base_param)
-                    param = param.replace(old_base, base_param)  # need to replace the alias
-
-                fields = getattr(self.view.serializer_class.Meta, 'fields', [])
-                exclude = getattr(self.view.serializer_class.Meta, 'exclude', [])
-                search_fields = getattr(self.view.serializer_class.Meta, 'search_fields', [])
-
-                # Skip if the parameter is not listed in the serializer's `fields`
-                # or if it's in the `exclude` list.
-                if ((fields or search_fields) and base_param not in
-                        chain(fields, search_fields)) or base_param in exclude or not value:
-                    continue
+            filter_param = field_lookup.resolve(param)
+
+            # Skip if the parameter is not listed in the serializer's `fields`
+            # or if it's in the `exclude` list.
+            if filter_param is None or (field_lookup.serializer_class and not value):
+                continue
+
+            param, param_parts, excluding_term = filter_param.param, filter_param.lookups, filter_param.excluding
 
             param_queries = []
             if len(param_parts) > 1 and param_parts[-1] in ('in', 'range'):
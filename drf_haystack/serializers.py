@@ -4,7 +4,9 @@ from __future__ import absolute_import, unicode_literals
 
 import copy
 import six
+import threading
 import warnings
+from bisect import bisect_left
 from itertools import chain
 from datetime import datetime
 
@@ -15,19 +17,78 @@ except ImportError:
 
 from django.core.exceptions import ImproperlyConfigured, FieldDoesNotExist
 
-from haystack import fields as haystack_fields
+from haystack import connections, fields as haystack_fields
+from haystack.constants import DEFAULT_ALIAS
+from haystack.exceptions import NotHandled
 from haystack.query import EmptySearchQuerySet
-from haystack.utils.highlighting import Highlighter
+
+from six.moves.urllib.parse import quote_plus
 
 from rest_framework import serializers
-from rest_framework.fields import empty
+from rest_framework.fields import SkipField, empty
+from rest_framework.relations import PKOnlyObject
 from rest_framework.utils.field_mapping import ClassLookupDict, get_field_kwargs
+from rest_framework.utils.serializer_helpers import BindingDict
 
 from drf_haystack.fields import (
     HaystackBooleanField, HaystackCharField, HaystackDateField, HaystackDateTimeField,
     HaystackDecimalField, HaystackFloatField, HaystackIntegerField, HaystackMultiValueField,
     FacetDictField, FacetListField
 )
+from drf_haystack.highlighting import FastHighlighter
+
+
+_field_blueprint_lock = threading.Lock()
+
+# Facet values are converted with the same fields (and thus output format) as before,
+# but the field instances are shared instead of created for every facet item.
+_facet_datetime_field = serializers.DateTimeField(read_only=True)
+_facet_text_converters = {}
+_document_fields = {}
+
+
+def _identity(value):
+    return value
+
+
+def get_facet_text_converter(value_type):
+    """
+    Returns the function used to convert a faceted value of ``value_type`` to its
+    representation. It's looked up once per type.
+    """
+    try:
+        return _facet_text_converters[value_type]
+    except KeyError:
+        if issubclass(value_type, (six.text_type, six.string_types)):
+            converter = six.text_type
+        elif issubclass(value_type, datetime):
+            converter = _facet_datetime_field.to_representation
+        else:
+            converter = _identity
+        _facet_text_converters[value_type] = converter
+        return converter
+
+
+def clone_bound_field(field, parent=None):
+    """
+    Returns a shallow copy of ``field``, where its child fields (which are already
+    bound) are copied too and re-parented to the copy. This is a lot cheaper than
+    instantiating the whole field tree again.
+    """
+    clone = copy.copy(field)
+    if parent is not None:
+        clone.parent = parent
+
+    child = getattr(field, "child", None)
+    if isinstance(child, serializers.Field):
+        clone.child = clone_bound_field(child, clone)
+
+    if "fields" in field.__dict__:
+        fields = BindingDict(clone)
+        for field_name, child_field in field.fields.items():
+            fields.fields[field_name] = clone_bound_field(child_field, clone)
+        clone.fields = fields
+    return clone
 
 
 class Meta(type):
@@ -120,6 +181,13 @@ class HaystackSerializer(six.with_metaclass(HaystackSerializerMeta, serializers.
         if not self.instance:
             self.instance = EmptySearchQuerySet()
 
+        # Maps each ``SearchIndex`` class to the fields which should be rendered
+        # for its results. See ``_get_representation_plan()``.
+        self._representation_plans = {}
+
+        # Child serializer instances for ``Meta.serializers``, keyed by ``SearchIndex`` class.
+        self._child_serializers = {}
+
     @staticmethod
     def _get_default_field_kwargs(model, field):
         """
@@ -162,27 +230,56 @@ class HaystackSerializer(six.with_metaclass(HaystackSerializerMeta, serializers.
         aliases = self.Meta.index_aliases
         return aliases.get(cls_name, cls_name.split('.')[-1])
 
-    def get_fields(self):
+    @classmethod
+    def clear_field_cache(cls):
         """
-        Get the required fields for serializing the result.
+        Drop the compiled field blueprint for this serializer class, forcing
+        it to be rebuilt the next time the serializer fields are requested.
+        Mostly useful in tests which modify the indexes at runtime.
         """
+        with _field_blueprint_lock:
+            if "_field_blueprint" in cls.__dict__:
+                delattr(cls, "_field_blueprint")
 
+    def _get_field_blueprint(self):
+        """
+        Returns a list of ``(field_name, field_class, kwargs)`` tuples describing
+        the index fields to serialize. The blueprint only depends on the ``Meta``
+        class, so it's compiled once per serializer class and reused by all
+        instances.
+        """
+        cls = self.__class__
+        blueprint = cls.__dict__.get("_field_blueprint")
+        if blueprint is None:
+            with _field_blueprint_lock:
+                blueprint = cls.__dict__.get("_field_blueprint")
+                if blueprint is None:
+                    blueprint = self._build_field_blueprint()
+                    cls._field_blueprint = blueprint
+        return blueprint
+
+    def _build_field_blueprint(self):
+        """
+        Compile the field blueprint from ``Meta.index_classes``, ``fields``,
+        ``exclude`` and ``ignore_fields``.
+        """
         fields = self.Meta.fields
         exclude = self.Meta.exclude
         ignore_fields = self.Meta.ignore_fields
         indices = self.Meta.index_classes
 
-        declared_fields = copy.deepcopy(self._declared_fields)
         prefix_field_names = len(indices) > 1
-        field_mapping = OrderedDict()
+        blueprint = []
 
         # overlapping fields on multiple indices is supported by internally prefixing the field
         # names with the index class to which they belong or, optionally, a user-provided alias
         # for the index.
-        for index_cls in self.Meta.index_classes:
+        for index_cls in indices:
             prefix = ""
             if prefix_field_names:
                 prefix = "_%s__" % self._get_index_class_name(index_cls)
+
+            model = None
             for field_name, field_type in six.iteritems(index_cls.fields):
                 orig_name = field_name
                 field_name = "%s%s" % (prefix, field_name)
@@ -201,43 +298,89 @@ class HaystackSerializer(six.with_metaclass(HaystackSerializerMeta, serializers.
 
                 # Look up the field attributes on the current index model,
                 # in order to correctly instantiate the serializer field.
-                model = index_cls().get_model()
+                if model is None:
+                    model = index_cls().get_model()
                 kwargs = self._get_default_field_kwargs(model, field_type)
-                kwargs['prefix_field_names'] = prefix_field_names
-                field_mapping[field_name] = self._field_mapping[field_type](**kwargs)
+                kwargs["prefix_field_names"] = prefix_field_names
+                blueprint.append((field_name, self._field_mapping[field_type], kwargs))
+
+        return blueprint
+
+    def get_fields(self):
+        """
+        Get the required fields for serializing the result.
+        """
+        field_mapping = OrderedDict()
+        for field_name, field_class, kwargs in self._get_field_blueprint():
+            field_mapping[field_name] = field_class(**kwargs)
 
         # Add any explicitly declared fields. They *will* override any index fields
         # in case of naming collision!.
-        if declared_fields:
-            for field_name in declared_fields:
-                field_mapping[field_name] = declared_fields[field_name]
+        declared_fields = copy.deepcopy(self._declared_fields)
+        for field_name in declared_fields:
+            field_mapping[field_name] = declared_fields[field_name]
         return field_mapping
 
+    def _get_representation_plan(self, searchindex):
+        """
+        Returns the ordered list of ``(output_key, field)`` pairs which should be
+        rendered for a search result belonging to ``searchindex``. The plan is
+        computed once per index class and reused for every result.
+        """
+        index_cls = type(searchindex)
+        plan = self._representation_plans.get(index_cls)
+        if plan is None:
+            plan = self._representation_plans[index_cls] = self._build_representation_plan(searchindex)
+        return plan
+
+    def _build_representation_plan(self, searchindex):
+        """
+        Since we might be dealing with multiple indexes, some fields might not be
+        valid for all results. Prefixed fields belonging to ``searchindex`` are
+        rendered without their prefix (after any unprefixed fields), while fields
+        belonging to other indexes are left out altogether.
+        """
+        prefix_field_names = len(getattr(self.Meta, "index_classes")) > 1
+        current_index = self._get_index_class_name(type(searchindex))
+
+        plan = []
+        prefixed_plan = []
+        for field_name, field in self.fields.items():
+            if field.write_only:
+                continue
+            if prefix_field_names:
+                parts = field_name.split("__")
+                if len(parts) > 1:
+                    index = parts[0][1:]  # trim the preceding '_'
+                    if index == current_index:
+                        prefixed_plan.append((parts[1], field))
+                    continue
+            elif field_name not in chain(searchindex.fields.keys(), self._declared_fields.keys()):
+                continue
+            plan.append((field_name, field))
+
+        return plan + prefixed_plan
+
     def to_representation(self, instance):
         """
-        If we have a serializer mapping, use that.  Otherwise, use standard serializer behavior
-        Since we might be dealing with multiple indexes, some fields might
-        not be valid for all results. Do not render the fields which don't belong
-        to the search result.
+        If we have a serializer mapping, use that. Otherwise, only render the
+        fields in the representation plan for the index of the search result.
         """
         if self.Meta.serializers:
             ret = self.multi_serializer_representation(instance)
         else:
-            ret = super(HaystackSerializer, self).to_representation(instance)
-            prefix_field_names = len(getattr(self.Meta, "index_classes")) > 1
-            current_index = self._get_index_class_name(type(instance.searchindex))
-            for field in self.fields.keys():
-                orig_field = field
-                if prefix_field_names:
-                    parts = field.split("__")
-                    if len(parts) > 1:
-                        index = parts[0][1:]  # trim the preceding '_'
-                        field = parts[1]
-                        if index == current_index:
-                            ret[field] = ret[orig_field]
-                        del ret[orig_field]
-                elif field not in chain(instance.searchindex.fields.keys(), self._declared_fields.keys()):
-                    del ret[orig_field]
+            ret = OrderedDict()
+            for field_name, field in self._get_representation_plan(instance.searchindex):
+                try:
+                    attribute = field.get_attribute(instance)
+                except SkipField:
+                    continue
+
+                check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+                if check_for_none is None:
+                    ret[field_name] = None
+                else:
+                    ret[field_name] = field.to_representation(attribute)
 
         # include the highlighted field in either case
         if getattr(instance, "highlighted", None):
@@ -245,12 +388,19 @@ class HaystackSerializer(six.with_metaclass(HaystackSerializerMeta, serializers.
         return ret
 
     def multi_serializer_representation(self, instance):
-        serializers = self.Meta.serializers
-        index = instance.searchindex
-        serializer_class = serializers.get(type(index), None)
-        if not serializer_class:
-            raise ImproperlyConfigured("Could not find serializer for %s in mapping" % index)
-        return serializer_class(context=self._context).to_representation(instance)
+        """
+        Render the search result with the serializer mapped to its index in
+        ``Meta.serializers``. Each child serializer is instantiated once and
+        reused for all results belonging to the same index.
+        """
+        index_cls = type(instance.searchindex)
+        serializer = self._child_serializers.get(index_cls)
+        if serializer is None:
+            serializer_class = self.Meta.serializers.get(index_cls, None)
+            if not serializer_class:
+                raise ImproperlyConfigured("Could not find serializer for %s in mapping" % instance.searchindex)
+            serializer = self._child_serializers[index_cls] = serializer_class(context=self.context)
+        return serializer.to_representation(instance)
 
 
 class FacetFieldSerializer(serializers.Serializer):
@@ -264,6 +414,7 @@ class FacetFieldSerializer(serializers.Serializer):
 
     def __init__(self, *args, **kwargs):
         self._parent_field = None
+        self._fast_representation = None
         super(FacetFieldSerializer, self).__init__(*args, **kwargs)
 
     @property
@@ -317,40 +468,65 @@ class FacetFieldSerializer(serializers.Serializer):
         The text field should contain the faceted value.
         """
         instance = instance[0]
-        if isinstance(instance, (six.text_type, six.string_types)):
-            return serializers.CharField(read_only=True).to_representation(instance)
-        elif isinstance(instance, datetime):
-            return serializers.DateTimeField(read_only=True).to_representation(instance)
-        return instance
+        return get_facet_text_converter(type(instance))(instance)
 
     def get_count(self, instance):
         """
         Haystack facets are returned as a two-tuple (value, count).
         The count field should contain the faceted count.
         """
-        instance = instance[1]
-        return serializers.IntegerField(read_only=True).to_representation(instance)
+        return int(instance[1])
 
-    def get_narrow_url(self, instance):
+    def get_narrow_url_base(self):
         """
-        Return a link suitable for narrowing on the current item.
+        Return the parts of the narrow url which are the same for all the facet
+        items in the response, as a ``(prefix, query, facet_param, selected_facets, encoded_facets, encoding)``
+        tuple. It's computed once and cached on the root serializer.
         """
-        text = instance[0]
-        request = self.context["request"]
-        query_params = request.GET.copy()
-
-        # Never keep the page query parameter in narrowing urls.
-        # It will raise a NotFound exception when trying to paginate a narrowed queryset.
         page_query_param = self.get_paginate_by_param()
-        if page_query_param and page_query_param in query_params:
-            del query_params[page_query_param]
+        facet_query_params_text = self.root.facet_query_params_text
+        cache_key = (page_query_param, facet_query_params_text)
+
+        cache = self.root.__dict__.setdefault("_narrow_url_bases", {})
+        if cache_key not in cache:
+            request = self.context["request"]
+            query_params = request.GET.copy()
+
+            # Never keep the page query parameter in narrowing urls.
+            # It will raise a NotFound exception when trying to paginate a narrowed queryset.
+            if page_query_param and page_query_param in query_params:
+                del query_params[page_query_param]
+
+            selected_facets = sorted(set(query_params.pop(facet_query_params_text, [])))
+            facet_param = quote_plus(facet_query_params_text, encoding=query_params.encoding)
+            encoded_facets = [
+                "%s=%s" % (facet_param, quote_plus(facet, encoding=query_params.encoding))
+                for facet in selected_facets
+            ]
 
-        selected_facets = set(query_params.pop(self.root.facet_query_params_text, []))
-        selected_facets.add("%(field)s_exact:%(text)s" % {"field": self.parent_field, "text": text})
-        query_params.setlist(self.root.facet_query_params_text, sorted(selected_facets))
+            query = query_params.urlencode()
+            prefix = "%(url)s?" % {"url": request.build_absolute_uri(request.path_info)}
+            cache[cache_key] = (
+                prefix, [query] if query else [], facet_param, selected_facets, encoded_facets, query_params.encoding
+            )
+        return cache[cache_key]
 
-        path = "%(path)s?%(query)s" % {"path": request.path_info, "query": query_params.urlencode()}
-        url = request.build_absolute_uri(path)
+    def get_narrow_url(self, instance):
+        """
+        Return a link suitable for narrowing on the current item.
+        """
+        prefix, query, facet_param, selected_facets, encoded_facets, encoding = self.get_narrow_url_base()
+
+        # The selected facets are kept sorted, so just insert the
+        # current item where it belongs unless it's already selected.
+        facet = "%(field)s_exact:%(text)s" % {"field": self.parent_field, "text": instance[0]}
+        index = bisect_left(selected_facets, facet)
+        if index == len(selected_facets) or selected_facets[index] != facet:
+            encoded_facets = encoded_facets[:index] + [
+                "%s=%s" % (facet_param, quote_plus(facet, encoding=encoding))
+            ] + encoded_facets[index:]
+
+        url = prefix + "&".join(chain(query, encoded_facets))
         return serializers.Hyperlink(url, "narrow-url")
 
     def to_representation(self, field, instance):
@@ -359,8 +535,28 @@ class FacetFieldSerializer(serializers.Serializer):
         so that each field can query it to see what kind of attribute they are processing.
         """
         self.parent_field = field
+        if self.use_fast_representation():
+            return OrderedDict([
+                ("text", self.get_text(instance)),
+                ("count", self.get_count(instance)),
+                ("narrow_url", self.get_narrow_url(instance))
+            ])
         return super(FacetFieldSerializer, self).to_representation(instance)
 
+    def use_fast_representation(self):
+        """
+        Returns ``True`` if the serializer only has the default ``text``, ``count`` and
+        ``narrow_url`` fields, in which case the facet items can be rendered without
+        going through the field machinery.
+        """
+        if self._fast_representation is None:
+            self._fast_representation = (
+                list(self.fields) == ["text", "count", "narrow_url"] and
+                all(isinstance(field, serializers.SerializerMethodField) and
+                    field.method_name == "get_%s" % name for name, field in self.fields.items())
+            )
+        return self._fast_representation
+
 
 class HaystackFacetSerializer(six.with_metaclass(HaystackSerializerMeta, serializers.Serializer)):
     """
@@ -381,17 +577,35 @@ class HaystackFacetSerializer(six.with_metaclass(HaystackSerializerMeta, seriali
         ``dates``, ``fields`` and ``queries``.
         """
         field_mapping = OrderedDict()
+        facet_field_template = self.get_facet_field_template()
         for field, data in self.instance.items():
-            field_mapping.update(
-                {field: self.facet_dict_field_class(
-                    child=self.facet_list_field_class(child=self.facet_field_serializer_class(data)), required=False)}
-            )
+            facet_field = clone_bound_field(facet_field_template)
+            facet_field.child.child.instance = data
+            field_mapping[field] = facet_field
 
         if self.serialize_objects is True:
             field_mapping["objects"] = serializers.SerializerMethodField()
 
         return field_mapping
 
+    def get_facet_field_template(self):
+        """
+        Returns the ``facet_dict_field_class`` -> ``facet_list_field_class`` ->
+        ``facet_field_serializer_class`` field tree. It's built once per serializer
+        class, and ``get_fields()`` uses copies of it for each of the top most fields.
+        """
+        cls = self.__class__
+        template = cls.__dict__.get("_facet_field_template")
+        if template is None:
+            with _field_blueprint_lock:
+                template = cls.__dict__.get("_facet_field_template")
+                if template is None:
+                    template = self.facet_dict_field_class(
+                        child=self.facet_list_field_class(child=self.facet_field_serializer_class()), required=False)
+                    template.child.child.fields  # Make sure the nested fields are built (and copied) only once
+                    cls._facet_field_template = template
+        return template
+
     def get_objects(self, instance):
         """
         Return a list of objects matching the faceted result.
@@ -426,13 +640,93 @@ class HaystackFacetSerializer(six.with_metaclass(HaystackSerializerMeta, seriali
         return self.context["facet_query_params_text"]
 
 
+class HaystackObjectListSerializer(serializers.ListSerializer):
+    """
+    A ``ListSerializer`` which loads the model objects for all the search results
+    up-front, using a single ``in_bulk()`` query per model, instead of letting each
+    result fetch its own object from the database.
+
+    The child serializer may declare ``select_related`` and ``prefetch_related``
+    on its ``Meta`` class, which will be applied to the bulk queries.
+    """
+
+    def to_representation(self, data):
+        results = list(data)
+        self.load_objects(results)
+        return super(HaystackObjectListSerializer, self).to_representation(results)
+
+    def get_object_queryset(self, model):
+        """
+        Return the queryset used to load the objects for ``model``.
+        """
+        try:
+            queryset = connections[DEFAULT_ALIAS].get_unified_index().get_index(model).read_queryset()
+        except NotHandled:
+            queryset = model._default_manager.all()
+
+        meta = getattr(self.child, "Meta", None)
+        select_related = getattr(meta, "select_related", None)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+
+        prefetch_related = getattr(meta, "prefetch_related", None)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+
+        return queryset
+
+    def load_objects(self, results):
+        """
+        Populate ``result.object`` for all search results which hasn't
+        already been loaded (ie. by ``SearchQuerySet.load_all()``).
+        """
+        pending = OrderedDict()
+        for result in results:
+            if getattr(result, "_object", None) is None and getattr(result, "model", None) is not None:
+                pending.setdefault(result.model, []).append(result)
+
+        for model, model_results in pending.items():
+            objects = self.get_object_queryset(model).in_bulk([result.pk for result in model_results])
+            to_python = model._meta.pk.to_python
+            for result in model_results:
+                obj = objects.get(to_python(result.pk))
+                if obj is not None:
+                    result.object = obj
+
+
 class HaystackSerializerMixin(object):
     """
     This mixin can be added to a serializer to use the actual object as the data source for serialization rather
     than the data stored in the search index fields.  This makes it easy to return data from search results in
-    the same format as elsewhere in your API and reuse your existing serializers
+    the same format as elsewhere in your API and reuse your existing serializers.
+
+    When serializing many results, the objects are loaded in bulk by the ``HaystackObjectListSerializer``.
     """
 
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        """
+        Like ``Serializer.many_init()``, but defaults to a ``HaystackObjectListSerializer``
+        unless the ``Meta`` class sets a ``list_serializer_class``.
+        """
+        list_kwargs = {}
+        # DRF < 3.14 doesn't name the list-only kwargs which the child mustn't get.
+        remove_kwargs = getattr(
+            serializers, "LIST_SERIALIZER_KWARGS_REMOVE", ("allow_empty", "max_length", "min_length")
+        )
+        for key in remove_kwargs:
+            value = kwargs.pop(key, None)
+            if value is not None:
+                list_kwargs[key] = value
+        list_kwargs["child"] = cls(*args, **kwargs)
+        list_kwargs.update({
+            key: value for key, value in kwargs.items()
+            if key in serializers.LIST_SERIALIZER_KWARGS
+        })
+        meta = getattr(cls, "Meta", None)
+        list_serializer_class = getattr(meta, "list_serializer_class", HaystackObjectListSerializer)
+        return list_serializer_class(*args, **list_kwargs)
+
     def to_representation(self, instance):
         obj = instance.object
         return super(HaystackSerializerMixin, self).to_representation(obj)
@@ -445,7 +739,7 @@ class HighlighterMixin(object):
     for more info).
     """
 
-    highlighter_class = Highlighter
+    highlighter_class = FastHighlighter
     highlighter_css_class = "highlighted"
     highlighter_html_tag = "span"
     highlighter_max_length = 200
@@ -464,28 +758,52 @@ class HighlighterMixin(object):
     def get_document_field(instance):
         """
         Returns which field the search index has marked as it's
-        `document=True` field.
+        `document=True` field. The result is cached per index class.
         """
-        for name, field in instance.searchindex.fields.items():
-            if field.document is True:
-                return name
+        index_cls = type(instance.searchindex)
+        try:
+            return _document_fields[index_cls]
+        except KeyError:
+            document_field = None
+            for name, field in instance.searchindex.fields.items():
+                if field.document is True:
+                    document_field = name
+                    break
+            _document_fields[index_cls] = document_field
+            return document_field
 
     def get_terms(self, data):
         """
-        Returns the terms to be highlighted
+        Returns the terms to be highlighted. They only depend on
+        the request, so they're computed once per serializer.
         """
-        terms = " ".join(six.itervalues(self.context["request"].GET))
+        terms = self.__dict__.get("_highlighter_terms")
+        if terms is None:
+            terms = self._highlighter_terms = " ".join(six.itervalues(self.context["request"].GET))
         return terms
 
+    def get_highlighter_instance(self, terms):
+        """
+        Returns a highlighter for ``terms``. The highlighter is reused for
+        all the rows, and only created again if the terms changes.
+        """
+        cached = self.__dict__.get("_highlighter_cache")
+        if cached is not None and cached[0] == terms:
+            return cached[1]
+
+        highlighter = self.get_highlighter()(terms, **{
+            "html_tag": self.highlighter_html_tag,
+            "css_class": self.highlighter_css_class,
+            "max_length": self.highlighter_max_length
+        })
+        self._highlighter_cache = (terms, highlighter)
+        return highlighter
+
     def to_representation(self, instance):
         ret = super(HighlighterMixin, self).to_representation(instance)
         terms = self.get_terms(ret)
         if terms:
-            highlighter = self.get_highlighter()(terms, **{
-                "html_tag": self.highlighter_html_tag,
-                "css_class": self.highlighter_css_class,
-                "max_length": self.highlighter_max_length
-            })
+            highlighter = self.get_highlighter_instance(terms)
             document_field = self.get_document_field(instance)
             if highlighter and document_field:
                 # Handle case where this data is None, but highlight expects it to be a string
@@ -3,7 +3,17 @@
 from __future__ import absolute_import, unicode_literals
 
 import six
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, wait
 from copy import deepcopy
+from functools import wraps
+
+from django.db import close_old_connections
+from haystack import connections
+from haystack.constants import DEFAULT_ALIAS
+
+from drf_haystack import constants
 
 
 def merge_dict(a, b):
@@ -29,3 +39,165 @@ def merge_dict(a, b):
             result[key] = deepcopy(val)
 
     return result
+
+
+class LRUCache(object):
+    """
+    A thread safe mapping holding at most ``maxsize`` items, which
+    evicts the least recently used item when full.
+    A ``maxsize`` of 0 disables the cache.
+
+    The ``hits`` and ``misses`` attributes counts the outcome of ``get()``.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return self._data[key]
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class IndexModelResolver(object):
+    """
+    Resolves ``app_label.model`` names to the model classes registered
+    with the haystack indexes, without touching the database.
+
+    Names which doesn't match any indexed model are remembered in a
+    bounded negative cache, so they won't trigger a new scan of the
+    unified index every time they're requested.
+    """
+
+    def __init__(self, using=DEFAULT_ALIAS, max_unknown_names=256):
+        self.using = using
+        self._models = None
+        self._unknown_names = LRUCache(maxsize=max_unknown_names)
+        self._lock = threading.Lock()
+
+    def get_indexed_models(self, refresh=False):
+        """
+        Return a ``{"app_label.model": model}`` mapping of all the indexed models.
+        """
+        with self._lock:
+            if self._models is None or refresh:
+                unified_index = connections[self.using].get_unified_index()
+                self._models = dict(
+                    (model._meta.label_lower, model) for model in unified_index.get_indexed_models()
+                )
+            return self._models
+
+    def resolve(self, name):
+        """
+        Return the indexed model class matching the (case insensitive)
+        ``app_label.model`` name, or ``None`` if there is no such model.
+        """
+        name = name.lower()
+        model = self.get_indexed_models().get(name)
+        if model is None and name not in self._unknown_names:
+            # Indexes may have been registered since the mapping was built.
+            model = self.get_indexed_models(refresh=True).get(name)
+            if model is None:
+                self._unknown_names.set(name, True)
+        return model
+
+    def clear(self):
+        with self._lock:
+            self._models = None
+        self._unknown_names.clear()
+
+
+index_model_resolver = IndexModelResolver()
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name="default"):
+    """
+    Returns the named thread pool which is used for running search queries off
+    the request thread, with at most ``DRF_HAYSTACK_MAX_WORKERS`` threads.
+    """
+    with _executors_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(
+                max_workers=constants.DRF_HAYSTACK_MAX_WORKERS, thread_name_prefix="drf_haystack_%s" % name)
+        return _executors[name]
+
+
+def closing_connections(func):
+    """
+    Decorates a function which is run in an executor thread, so that the database
+    connections it opened are closed afterwards (if they've outlived ``CONN_MAX_AGE``),
+    just like Django does at the end of a request.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return wrapper
+
+
+def run_concurrently(funcs, timeout=None):
+    """
+    Calls the ``funcs`` concurrently and returns a list of their results.
+    The functions are called in the ``"queries"`` thread pool (which the
+    async views doesn't share, so that they can't end up waiting for
+    themselves), except that the first one is called in the current thread
+    when there's no ``timeout``.
+
+    Raises ``concurrent.futures.TimeoutError`` if the results aren't ready
+    within ``timeout`` seconds.
+    """
+    executor = get_executor("queries")
+    if timeout is not None:
+        futures = [executor.submit(closing_connections(func)) for func in funcs]
+        done, not_done = wait(futures, timeout=timeout)
+        if not_done:
+            for future in not_done:
+                future.cancel()
+            raise TimeoutError()
+        return [future.result() for future in futures]
+
+    futures = [executor.submit(closing_connections(func)) for func in funcs[1:]]
+    try:
+        results = [funcs[0]()]
+    except Exception:
+        for future in futures:
+            future.cancel()
+        raise
+    return results + [future.result() for future in futures]
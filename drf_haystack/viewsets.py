@@ -13,4 +13,9 @@ class HaystackViewSet(RetrieveModelMixin, ListModelMixin, ViewSetMixin, Haystack
     The HaystackViewSet class provides the default ``list()`` and
     ``retrieve()`` actions with a haystack index as it's data source.
     """
-    pass
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(request, super(HaystackViewSet, self).list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(request, super(HaystackViewSet, self).retrieve, *args, **kwargs)
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+#
+# Unit tests for the `drf_haystack.cache` module.
+#
+
+from __future__ import absolute_import, unicode_literals
+
+from django.contrib.gis.measure import D
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from haystack.query import SearchQuerySet
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from drf_haystack.cache import (
+    CacheInvalidationMixin, get_model_versions, get_or_set, get_query_signature, invalidate_models
+)
+from drf_haystack.mixins import FacetMixin
+from drf_haystack.viewsets import HaystackViewSet
+
+from .mockapp.models import MockPerson, MockPet
+
+factory = APIRequestFactory()
+
+
+class CacheTestCase(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_get_or_set(self):
+        calls = []
+
+        def func():
+            calls.append(1)
+            return "spam"
+
+        self.assertEqual(get_or_set("key", func, timeout=60), "spam")
+        self.assertEqual(get_or_set("key", func, timeout=60), "spam")
+        self.assertEqual(len(calls), 1)
+
+    def test_get_or_set_not_cacheable(self):
+        calls = []
+
+        def func():
+            calls.append(1)
+            return "eggs"
+
+        for _ in range(2):
+            self.assertEqual(get_or_set("key", func, timeout=60, is_cacheable=lambda value: False), "eggs")
+        self.assertEqual(len(calls), 2)
+
+    def test_query_signature_with_geo_filters(self):
+        class Point(object):
+            # Stands in for a GEOS point, whose repr() holds its memory address.
+            def __init__(self, x, y):
+                self.srid = 4326
+                self.coords = (x, y)
+
+        def dwithin(x, y, km):
+            queryset = SearchQuerySet().models(MockPerson)
+            queryset.query.dwithin = {"field": "location", "point": Point(x, y), "distance": D(km=km)}
+            return queryset
+
+        self.assertEqual(get_query_signature(dwithin(10, 59, 1)), get_query_signature(dwithin(10, 59, 1)))
+        self.assertNotEqual(get_query_signature(dwithin(10, 59, 1)), get_query_signature(dwithin(10, 60, 1)))
+        self.assertNotEqual(get_query_signature(dwithin(10, 59, 1)), get_query_signature(dwithin(10, 59, 2)))
+
+        within = SearchQuerySet()
+        within.query.within = {"field": "location", "point_1": Point(10, 59), "point_2": Point(11, 60)}
+        self.assertEqual(get_query_signature(within), get_query_signature(within._clone()))
+
+    def test_invalidate_models(self):
+        person_version, pet_version = get_model_versions([MockPerson, MockPet])
+        self.assertEqual(get_model_versions([MockPerson, MockPet]), (person_version, pet_version))
+
+        invalidate_models(MockPerson)
+        self.assertEqual(get_model_versions([MockPerson, MockPet]), (person_version + 1, pet_version))
+
+    def test_signal_processor_mixin_invalidates_indexed_models(self):
+        class SignalProcessor(object):
+            def handle_save(self, sender, instance, **kwargs):
+                pass
+
+        class CachedSignalProcessor(CacheInvalidationMixin, SignalProcessor):
+            pass
+
+        version, = get_model_versions([MockPerson])
+        CachedSignalProcessor().handle_save(MockPerson, MockPerson())
+        self.assertEqual(get_model_versions([MockPerson]), (version + 1, ))
+
+
+class HaystackViewSetResponseCacheTestCase(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        calls = self.calls = []
+
+        class ViewSet(HaystackViewSet):
+            index_models = [MockPerson]
+            cache_timeout = 60
+
+            def spam(self, request):
+                return self.get_cached_response(request, self.get_spam_response)
+
+            def get_spam_response(self, request):
+                calls.append(request.query_params.get("q"))
+                return Response({"q": request.query_params.get("q")}, status=200 if calls[-1] else 400)
+
+        self.view = ViewSet.as_view(actions={"get": "spam"})
+
+    def tearDown(self):
+        cache.clear()
+
+    def get(self, data):
+        return self.view(factory.get(path="/", data=data))
+
+    def test_response_cache(self):
+        self.assertEqual(self.get({"q": "spam", "a": "1"}).content, b'{"q":"spam"}')
+        self.assertEqual(self.get({"a": "1", "q": "spam"}).content, b'{"q":"spam"}')
+        self.assertEqual(self.calls, ["spam"])
+
+        self.get({"q": "eggs"})
+        self.assertEqual(self.calls, ["spam", "eggs"])
+
+        invalidate_models(MockPerson)
+        self.get({"q": "spam", "a": "1"})
+        self.assertEqual(self.calls, ["spam", "eggs", "spam"])
+
+    def test_response_cache_skips_errors(self):
+        for _ in range(2):
+            self.assertEqual(self.get({}).status_code, 400)
+        self.assertEqual(self.calls, [None, None])
+
+
+class FacetCountsCacheTestCase(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        calls = self.calls = []
+
+        class CountingSearchQuerySet(SearchQuerySet):
+            def facet_counts(self):
+                calls.append(1)
+                return {
+                    "fields": {"firstname": [("John", 1)], "lastname": [("McClane", 1)]},
+                    "dates": {},
+                    "queries": {},
+                }
+
+        class ViewSet(FacetMixin, HaystackViewSet):
+            index_models = [MockPerson]
+            facet_cache_timeout = 60
+            facet_cache_timeouts = {"lastname": 10}
+
+        self.view = ViewSet()
+        self.queryset = CountingSearchQuerySet().models(MockPerson).facet("firstname").facet("lastname")
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_facet_counts_are_cached_for_all_pages(self):
+        facet_counts = self.view.get_facet_counts(self.queryset.filter(firstname="John"))
+
+        queryset = self.queryset.filter(firstname="John").order_by("lastname")
+        queryset.query.set_limits(10, 30)
+        self.assertEqual(self.view.get_facet_counts(queryset), facet_counts)
+        self.assertEqual(len(self.calls), 1)
+
+        self.view.get_facet_counts(self.queryset.filter(firstname="Jeremy"))
+        self.view.get_facet_counts(self.queryset.filter(firstname="John").narrow("lastname_exact:McClane"))
+        self.assertEqual(len(self.calls), 3)
+
+    def test_facet_cache_timeout_per_field(self):
+        facet_counts = self.view.get_facet_counts(self.queryset)
+        self.assertEqual(self.view.get_facet_cache_timeout(facet_counts), 10)
+        self.assertEqual(self.view.get_facet_cache_timeout({"fields": {"firstname": []}}), 60)
+
+    def test_facet_objects_queryset_without_facets(self):
+        queryset = self.view.get_facet_objects_queryset(self.queryset)
+        self.assertEqual(queryset.query.facets, {})
+        self.assertEqual(len(self.queryset.query.facets), 2)
@@ -10,10 +10,12 @@ from datetime import date, datetime, timedelta
 
 from unittest import skipIf
 
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
+from haystack.query import SearchQuerySet
 
 from rest_framework import status
 from rest_framework import serializers
+from rest_framework.request import Request
 from rest_framework.test import APIRequestFactory
 
 from drf_haystack.viewsets import HaystackViewSet
@@ -25,6 +27,7 @@ from drf_haystack.filters import (
     HaystackOrderingFilter
 )
 from drf_haystack.mixins import FacetMixin
+from drf_haystack.query import FilterFieldLookup, FilterParam, FilterQueryBuilder
 
 from . import geospatial_support, elasticsearch_version
 from .constants import MOCKLOCATION_DATA_SET_SIZE, MOCKPERSON_DATA_SET_SIZE
@@ -592,3 +595,137 @@ class OrderedHaystackViewSetTestCase(TestCase):
             [result["integerfield"] for result in content],
             list(MockAllField.objects.values_list("integerfield", flat=True).order_by("integerfield", "boolfield"))
         )
+
+
+class FilterQueryBuilderCacheTestCase(SimpleTestCase):
+
+    def setUp(self):
+        class Serializer1(HaystackSerializer):
+            class Meta:
+                index_classes = [MockPersonIndex]
+                fields = ["firstname", "lastname"]
+
+        class ViewSet1(HaystackViewSet):
+            index_models = [MockPerson]
+            serializer_class = Serializer1
+
+        self.view1 = ViewSet1
+        FilterQueryBuilder.query_cache.clear()
+
+    def tearDown(self):
+        FilterQueryBuilder.query_cache.clear()
+
+    def test_query_builder_cache_hit(self):
+        builder = FilterQueryBuilder(backend=HaystackFilter(), view=self.view1())
+        filters = {"firstname": ["John,Jeremy"], "lastname__not": ["McClane"], "spam": ["eggs"]}
+
+        first = builder.build_query(**filters)
+        second = builder.build_query(**dict(reversed(list(filters.items()))))
+        self.assertEqual(FilterQueryBuilder.query_cache.misses, 1)
+        self.assertEqual(FilterQueryBuilder.query_cache.hits, 1)
+
+        self.assertEqual(repr(first), repr(second))
+        self.assertIsNot(first[0], second[0])
+        self.assertIsNot(first[1], second[1])
+
+    def test_query_builder_cache_key_depends_on_view(self):
+        class ViewSet2(self.view1):
+            lookup_sep = ";"
+
+        filters = {"firstname": ["John;Jeremy"]}
+        FilterQueryBuilder(backend=HaystackFilter(), view=self.view1()).build_query(**filters)
+        filters, exclusions = FilterQueryBuilder(backend=HaystackFilter(), view=ViewSet2()).build_query(**filters)
+        self.assertEqual(FilterQueryBuilder.query_cache.hits, 0)
+        self.assertEqual(len(filters), 2)
+
+
+class FilterFieldLookupTestCase(SimpleTestCase):
+
+    def setUp(self):
+        class Serializer1(HaystackSerializer):
+            class Meta:
+                index_classes = [MockPersonIndex]
+                fields = ["firstname", "full_name"]
+                field_aliases = {"name": "full_name"}
+
+        class Serializer2(HaystackSerializer):
+            class Meta:
+                index_classes = [MockPersonIndex]
+                exclude = ["lastname"]
+
+        self.serializer1 = Serializer1
+        self.serializer2 = Serializer2
+
+    def test_field_lookup_resolve(self):
+        lookup = FilterFieldLookup(self.serializer1)
+        self.assertEqual(lookup.resolve("firstname__contains"),
+                         FilterParam("firstname__contains", "firstname", ("firstname", "contains"), False))
+        self.assertEqual(lookup.resolve("name__not"), FilterParam("full_name", "full_name", ("name", "not"), True))
+        self.assertIsNone(lookup.resolve("lastname"))
+        self.assertIsNone(lookup.resolve("spam"))
+
+        lookup = FilterFieldLookup(self.serializer2)
+        self.assertIsNone(lookup.resolve("lastname__not"))
+        self.assertEqual(lookup.resolve("spam").param, "spam")
+
+    def test_field_lookup_without_serializer_allows_all(self):
+        lookup = FilterFieldLookup()
+        self.assertEqual(lookup.resolve("spam__not__in"), FilterParam("spam__in", "spam", ("spam", "not", "in"), True))
+
+    def test_field_lookup_is_shared_per_serializer_class(self):
+        class ViewSet1(HaystackViewSet):
+            index_models = [MockPerson]
+            serializer_class = self.serializer1
+
+        builder1 = FilterQueryBuilder(backend=HaystackFilter(), view=ViewSet1())
+        builder2 = FilterQueryBuilder(backend=HaystackFilter(), view=ViewSet1())
+        self.assertIs(builder1.get_field_lookup(), builder2.get_field_lookup())
+
+
+class RequestFiltersTestCase(SimpleTestCase):
+
+    def test_request_filters_are_shared_between_backends(self):
+        request = Request(factory.get(path="/", data={"firstname": ["John", "Jeremy"], "boost": "John,2"}))
+        filters = HaystackFilter.get_request_filters(request)
+        self.assertIs(filters, HaystackBoostFilter.get_request_filters(request))
+        self.assertEqual(filters.getlist("firstname"), ["John", "Jeremy"])
+        self.assertRaises(AttributeError, filters.pop, "firstname")
+
+
+class HaystackHighlightFilterOptionsTestCase(SimpleTestCase):
+
+    def setUp(self):
+        class Serializer(HaystackSerializer):
+
+            class Meta:
+                index_classes = [MockPersonIndex]
+                fields = ["firstname", "lastname"]
+
+        class ViewSet(HaystackViewSet):
+            index_models = [MockPerson]
+            serializer_class = Serializer
+
+        self.view = ViewSet()
+
+    def filter_queryset(self, backend, data):
+        request = Request(factory.get(path="/", data=data))
+        return backend.filter_queryset(request, SearchQuerySet(), self.view)
+
+    def test_highlight_filter_only_highlights_filtered_queries(self):
+        self.assertFalse(self.filter_queryset(HaystackHighlightFilter(), {"page": 2}).query.highlight)
+        self.assertFalse(self.filter_queryset(HaystackHighlightFilter(), {"firstname__not": "jeremy"}).query.highlight)
+        self.assertTrue(self.filter_queryset(HaystackHighlightFilter(), {"firstname": "jeremy"}).query.highlight)
+
+    def test_highlight_filter_options(self):
+        class HighlightFilter(HaystackHighlightFilter):
+            highlight_fragment_size = 50
+            highlight_number_of_fragments = 2
+
+        queryset = self.filter_queryset(HighlightFilter(), {"firstname": "jeremy"})
+        self.assertEqual(queryset.query.highlight, {
+            "fields": {"text": {"fragment_size": 50, "number_of_fragments": 2, "store": "yes"}}
+        })
+
+        HighlightFilter.highlight_fields = ["firstname", "lastname"]
+        queryset = self.filter_queryset(HighlightFilter(), {"firstname": "jeremy"})
+        self.assertEqual(sorted(queryset.query.highlight["fields"]), ["firstname", "lastname"])
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+#
+# Unit tests for the `drf_haystack.highlighting` classes.
+#
+
+from __future__ import absolute_import, unicode_literals
+
+from django.test import SimpleTestCase
+from haystack.utils.highlighting import Highlighter
+
+from drf_haystack.highlighting import FastHighlighter
+
+
+class FastHighlighterTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.text_blocks = [
+            "",
+            "Jeremy Foreman is a nice chap!",
+            "<p>This is a <b>test</b> of the highlighting. Testing, testing, 1-2-3.</p>",
+            "aaaa baab abab " * 20,
+            "İstanbul is a city in Turkey, and istanbul is spelled İSTANBUL in capitals.",
+            " ".join(["search", "index", "filler"] * 300 + ["search index"] * 10),
+        ]
+        self.queries = ["", "test", "Testing -highlighting", "a aa ab b", "istanbul i", "search index", "nothing"]
+
+    def test_fast_highlighter_output(self):
+        for query in self.queries:
+            for options in ({"max_length": 10}, {}, {"html_tag": "em", "css_class": ""}):
+                highlighter = FastHighlighter(query, **options)
+                self.assertEqual(
+                    [highlighter.highlight(text_block) for text_block in self.text_blocks],
+                    [Highlighter(query, **options).highlight(text_block) for text_block in self.text_blocks]
+                )
+
+    def test_fast_highlighter_find_window(self):
+        highlighter = FastHighlighter("", max_length=10)
+        self.assertEqual(highlighter.find_window({}), (0, 10))
+        self.assertEqual(highlighter.find_window({"a": [25]}), (25, 35))
+        self.assertEqual(highlighter.find_window({"a": [25, 50]}), (25, 35))
+        self.assertEqual(highlighter.find_window({"a": [2, 30, 34], "b": [31, 50, 52]}), (30, 40))
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+#
+# Unit tests for the `drf_haystack.multisearch` module.
+#
+
+from __future__ import absolute_import, unicode_literals
+
+import json
+
+from django.test import SimpleTestCase
+from haystack import connections
+from haystack.query import SearchQuerySet
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APIRequestFactory
+
+from drf_haystack.filters import HaystackBoostFilter, HaystackFilter
+from drf_haystack.mixins import MultiSearchMixin
+from drf_haystack.multisearch import multi_search
+from drf_haystack.serializers import HaystackSerializer
+from drf_haystack.viewsets import HaystackViewSet
+
+from .mockapp.models import MockPerson
+from .mockapp.search_indexes import MockPersonIndex
+
+factory = APIRequestFactory()
+
+
+class StubConnection(object):
+    """
+    Stands in for the Elasticsearch client, returning the hits
+    matching the first name of each search.
+    """
+
+    def __init__(self, people):
+        self.people = people
+        self.requests = []
+
+    def msearch(self, body, **kwargs):
+        self.requests.append(body)
+        responses = []
+        for search in body[1::2]:
+            query = search["query"]["filtered"]["query"]["query_string"]["query"]
+            hits = [
+                {"_score": 1.0, "_source": dict(source, django_ct="mockapp.mockperson", django_id=str(pk))}
+                for pk, source in enumerate(self.people, start=1)
+                if source["firstname"] in query
+            ]
+            page = hits[search["from"]:search["from"] + search["size"]]
+            responses.append({"hits": {"total": len(hits), "hits": page}})
+        return {"responses": responses}
+
+
+class MultiSearchTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.backend = connections["default"].get_backend()
+        self.conn, self.setup_complete = self.backend.conn, self.backend.setup_complete
+        self.backend.conn = StubConnection([
+            {"firstname": "John", "lastname": "McClane"},
+            {"firstname": "Jeremy", "lastname": "Rowland"},
+            {"firstname": "John", "lastname": "Doe"},
+        ])
+        self.backend.setup_complete = True
+
+    def tearDown(self):
+        self.backend.conn, self.backend.setup_complete = self.conn, self.setup_complete
+
+    def test_multi_search(self):
+        john = SearchQuerySet().models(MockPerson).filter(firstname="John").facet("lastname")
+        jeremy = SearchQuerySet().models(MockPerson).filter(firstname="Jeremy")
+
+        multi_search([(john, 1, 3), (jeremy, 0, 10)])
+        self.assertEqual(len(self.backend.conn.requests), 1)
+
+        self.assertEqual(john.count(), 2)
+        self.assertEqual([result.lastname for result in john[1:3]], ["Doe"])
+        self.assertEqual([result.lastname for result in jeremy[0:10]], ["Rowland"])
+        self.assertEqual(len(self.backend.conn.requests), 1)
+
+    def test_batch_action(self):
+        class Serializer(HaystackSerializer):
+            class Meta:
+                index_classes = [MockPersonIndex]
+                fields = ["firstname", "lastname"]
+
+        class Pagination(PageNumberPagination):
+            page_size = 1
+
+        class ViewSet(MultiSearchMixin, HaystackViewSet):
+            index_models = [MockPerson]
+            serializer_class = Serializer
+            pagination_class = Pagination
+
+        view = ViewSet.as_view(actions={"post": "batch"})
+        request = factory.post(
+            path="/batch/", format="json",
+            data=[{"firstname": "John", "page": 2}, {"firstname": "Jeremy"}, {"firstname": "John", "page": 3}]
+        )
+        response = view(request)
+        response.render()
+        content = json.loads(response.content.decode())
+
+        self.assertEqual(len(self.backend.conn.requests), 1)
+        self.assertEqual([item["status"] for item in content], [200, 200, 404])
+        self.assertEqual(content[0]["data"]["count"], 2)
+        self.assertEqual(content[0]["data"]["results"], [{"firstname": "John", "lastname": "Doe"}])
+        self.assertEqual(content[1]["data"]["results"], [{"firstname": "Jeremy", "lastname": "Rowland"}])
+
+        self.assertEqual(content[0]["data"]["next"], None)
+        self.assertEqual(content[0]["data"]["previous"], "http://testserver/?firstname=John")
+        self.assertEqual(content[1]["data"]["next"], None)
+
+        response = view(factory.post(path="/search/batch/", format="json", data=[{"firstname": "John"}]))
+        response.render()
+        content = json.loads(response.content.decode())
+        self.assertEqual(content[0]["data"]["next"], "http://testserver/search/?firstname=John&page=2")
+
+    def test_batch_action_invalid_search(self):
+        class Serializer(HaystackSerializer):
+            class Meta:
+                index_classes = [MockPersonIndex]
+                fields = ["firstname", "lastname"]
+
+        class ViewSet(MultiSearchMixin, HaystackViewSet):
+            index_models = [MockPerson]
+            serializer_class = Serializer
+            filter_backends = [HaystackFilter, HaystackBoostFilter]
+
+        view = ViewSet.as_view(actions={"post": "batch"})
+        request = factory.post(
+            path="/batch/", format="json",
+            data=[{"firstname": "John"}, {"firstname": "Jeremy", "boost": "nice,chap"}]
+        )
+        response = view(request)
+        response.render()
+        content = json.loads(response.content.decode())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["status"] for item in content], [200, 400])
+        self.assertEqual(len(content[0]["data"]), 2)
+        self.assertEqual(len(self.backend.conn.requests[0]), 2)
+
+    def test_batch_action_validation(self):
+        class ViewSet(MultiSearchMixin, HaystackViewSet):
+            index_models = [MockPerson]
+            multi_search_max_size = 1
+
+        view = ViewSet.as_view(actions={"post": "batch"})
+        for data in ({"firstname": "John"}, [{"firstname": "John"}, {"firstname": "Jeremy"}]):
+            self.assertEqual(view(factory.post(path="/batch/", data=data, format="json")).status_code, 400)
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+#
+# Unit tests for the `drf_haystack.pagination` module.
+#
+
+from __future__ import absolute_import, unicode_literals
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from haystack.query import SearchQuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from six.moves.urllib.parse import parse_qs, urlparse
+
+from drf_haystack.pagination import (
+    HaystackCursorPagination, HaystackLimitOffsetPagination, HaystackPageNumberPagination
+)
+from drf_haystack.viewsets import HaystackViewSet
+
+from .mockapp.models import MockPerson
+
+factory = APIRequestFactory()
+
+
+class HaystackCursorPaginationTestCase(SimpleTestCase):
+
+    def setUp(self):
+        fetched = self.fetched = []
+        results = self.results = [
+            {"lastname": name, "id": "mockapp.mockperson.%d" % index}
+            for index, name in enumerate(["Doe", "Doe", "Holmes", "McClane", "Watson"])
+        ]
+
+        class StubSearchQuerySet(SearchQuerySet):
+            def __getitem__(self, k):
+                fetched.append((self.query.order_by, self.query.build_query()))
+                return results[k]
+
+        class Pagination(HaystackCursorPagination):
+            page_size = 2
+
+        self.queryset = StubSearchQuerySet()
+        self.pagination = Pagination()
+        self.view = HaystackViewSet()
+
+    def paginate(self, queryset, url="/"):
+        request = Request(factory.get(url))
+        return self.pagination.paginate_queryset(queryset, request, self.view)
+
+    def get_cursor(self, url):
+        return parse_qs(urlparse(url).query)["cursor"][0]
+
+    def test_ordering_with_uid_tie_breaker(self):
+        self.paginate(self.queryset.order_by("-lastname"))
+        self.assertEqual(self.pagination.ordering, ("-lastname", "id"))
+
+        self.paginate(self.queryset.order_by("lastname", "-id"))
+        self.assertEqual(self.pagination.ordering, ("lastname", "-id"))
+
+        self.pagination.ordering = "lastname"
+        self.paginate(self.queryset)
+        self.assertEqual(self.pagination.ordering, ("lastname", "id"))
+
+    def test_first_page(self):
+        page = self.paginate(self.queryset.order_by("lastname"))
+        self.assertEqual([result["id"] for result in page], ["mockapp.mockperson.0", "mockapp.mockperson.1"])
+        self.assertEqual(self.fetched, [(["lastname", "id"], "*:*")])
+        self.assertIsNone(self.pagination.get_previous_link())
+        self.assertIsNotNone(self.pagination.get_next_link())
+
+    def test_next_page_filters_on_position(self):
+        self.paginate(self.queryset.order_by("lastname"))
+        cursor = self.get_cursor(self.pagination.get_next_link())
+
+        self.paginate(self.queryset.order_by("lastname"), "/?cursor=%s" % cursor)
+        order_by, query = self.fetched[-1]
+        self.assertEqual(order_by, ["lastname", "id"])
+        self.assertEqual(
+            query,
+            '(lastname:({"Doe" TO *}) OR (lastname:("Doe") AND id:({"mockapp.mockperson.1" TO *})))'
+        )
+        self.assertIsNotNone(self.pagination.get_previous_link())
+
+    def test_previous_page_reverses_ordering(self):
+        self.paginate(self.queryset.order_by("lastname"))
+        cursor = self.get_cursor(self.pagination.get_next_link())
+        self.paginate(self.queryset.order_by("lastname"), "/?cursor=%s" % cursor)
+        cursor = self.get_cursor(self.pagination.get_previous_link())
+
+        page = self.paginate(self.queryset.order_by("lastname"), "/?cursor=%s" % cursor)
+        order_by, query = self.fetched[-1]
+        self.assertEqual(order_by, ["-lastname", "-id"])
+        self.assertEqual(
+            query,
+            '(lastname:({* TO "Doe"}) OR (lastname:("Doe") AND id:({* TO "mockapp.mockperson.0"})))'
+        )
+        self.assertEqual([result["id"] for result in page], ["mockapp.mockperson.1", "mockapp.mockperson.0"])
+        self.assertIsNotNone(self.pagination.get_next_link())
+
+    def test_results_without_position_are_left_out(self):
+        del self.results[1]["lastname"]
+        self.results[2]["lastname"] = None
+        page = self.paginate(self.queryset.order_by("lastname"))
+        self.assertEqual([result["id"] for result in page], ["mockapp.mockperson.0"])
+        self.assertIsNone(self.pagination.get_next_link())
+
+    def test_invalid_cursor(self):
+        self.paginate(self.queryset)
+        self.pagination.next_position = '["spam", "eggs", "bacon"]'
+        cursor = self.get_cursor(self.pagination.get_next_link())
+        with self.assertRaises(NotFound):
+            self.paginate(self.queryset, "/?cursor=%s" % cursor)
+
+
+class HaystackCountingPaginationTestCase(SimpleTestCase):
+
+    def setUp(self):
+        calls = self.calls = []
+
+        class StubSearchQuerySet(SearchQuerySet):
+            def __getitem__(self, k):
+                calls.append(("slice", k.start, k.stop))
+                return list(range(k.start, min(k.stop, 25000)))
+
+            def count(self):
+                calls.append(("count",))
+                return 25000
+
+        self.queryset = StubSearchQuerySet()
+
+    def paginate(self, pagination, url, queryset=None):
+        queryset = self.queryset if queryset is None else queryset
+        return pagination.paginate_queryset(queryset, Request(factory.get(url)))
+
+    def test_page_number_fetches_page_before_counting(self):
+        pagination = HaystackPageNumberPagination()
+        pagination.page_size = 10
+        self.assertEqual(self.paginate(pagination, "/?page=3"), list(range(20, 30)))
+        self.assertEqual(self.calls[:2], [("slice", 20, 30), ("count",)])
+
+        response = pagination.get_paginated_response([])
+        self.assertEqual(list(response.data), ["count", "next", "previous", "results"])
+        self.assertEqual(response.data["count"], 25000)
+
+    def test_page_number_count_ceiling(self):
+        pagination = HaystackPageNumberPagination()
+        pagination.page_size = 10
+        pagination.count_ceiling = 10000
+
+        self.paginate(pagination, "/?page=1000")
+        response = pagination.get_paginated_response([])
+        self.assertEqual(list(response.data), ["count", "count_capped", "next", "previous", "results"])
+        self.assertEqual(response.data["count"], 10000)
+        self.assertTrue(response.data["count_capped"])
+        self.assertIsNone(response.data["next"])
+
+        del self.calls[:]
+        with self.assertRaises(NotFound):
+            self.paginate(pagination, "/?page=1001")
+        self.assertEqual(self.calls, [("count",)])
+
+    def test_limit_offset_count_ceiling(self):
+        pagination = HaystackLimitOffsetPagination()
+        pagination.count_ceiling = 10000
+
+        self.assertEqual(self.paginate(pagination, "/?limit=5&offset=9995"), list(range(9995, 10000)))
+        self.assertEqual(self.calls[:2], [("slice", 9995, 10000), ("count",)])
+
+        response = pagination.get_paginated_response([])
+        self.assertEqual(response.data["count"], 10000)
+        self.assertTrue(response.data["count_capped"])
+        self.assertIsNone(response.data["next"])
+
+        del self.calls[:]
+        self.assertEqual(self.paginate(pagination, "/?limit=5&offset=9998"), [9998, 9999])
+        self.assertEqual(self.calls, [("slice", 9998, 10000), ("count",), ("slice", 9998, 10000)])
+
+        del self.calls[:]
+        self.assertEqual(self.paginate(pagination, "/?limit=5&offset=10005"), [])
+        self.assertEqual(self.calls, [("count",)])
+
+    def test_count_cache(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        pagination = HaystackPageNumberPagination()
+        pagination.page_size = 10
+        pagination.count_cache_timeout = 60
+        queryset = self.queryset.models(MockPerson).filter(firstname="John")
+
+        self.paginate(pagination, "/?page=2", queryset)
+        self.assertEqual(self.calls[:2], [("slice", 10, 20), ("count",)])
+
+        del self.calls[:]
+        self.paginate(pagination, "/?page=3", queryset._clone())
+        self.assertEqual(self.calls, [("slice", 20, 30)])
+
+        del self.calls[:]
+        self.paginate(pagination, "/?page=last", queryset._clone())
+        with self.assertRaises(NotFound):
+            self.paginate(pagination, "/?page=2501", queryset._clone())
+        self.assertEqual(self.calls, [("slice", 24990, 25000)])
+
+        self.paginate(pagination, "/?page=2", self.queryset.models(MockPerson).filter(firstname="Jeremy"))
+        self.assertIn(("count",), self.calls)
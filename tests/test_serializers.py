@@ -13,10 +13,13 @@ from django.urls import path, include
 from django.core.exceptions import ImproperlyConfigured
 from django.http import QueryDict
 from django.test import TestCase, SimpleTestCase, override_settings
+from haystack.models import SearchResult
 from haystack.query import SearchQuerySet
+from haystack.utils.highlighting import Highlighter
 
 from rest_framework import serializers
 from rest_framework.fields import CharField, IntegerField
+from rest_framework.request import Request
 from rest_framework.routers import DefaultRouter
 from rest_framework.test import APIRequestFactory, APITestCase
 
@@ -24,7 +27,7 @@ from drf_haystack import fields
 from drf_haystack.serializers import (
     HighlighterMixin, HaystackSerializer,
     HaystackSerializerMixin, HaystackFacetSerializer,
-    HaystackSerializerMeta)
+    HaystackSerializerMeta, HaystackObjectListSerializer, FacetFieldSerializer)
 from drf_haystack.viewsets import HaystackViewSet
 from drf_haystack.mixins import MoreLikeThisMixin, FacetMixin
 
@@ -210,6 +213,73 @@ class HaystackSerializerTestCase(WarningTestCaseMixin, TestCase):
         self.assertEqual(serializer.data['city'], "Declared overriding field")
 
 
+class HaystackSerializerFieldBlueprintTestCase(SimpleTestCase):
+
+    def setUp(self):
+        class Serializer1(HaystackSerializer):
+            class Meta:
+                index_classes = [MockPersonIndex]
+                fields = ["firstname", "lastname"]
+
+        class Serializer2(Serializer1):
+            class Meta:
+                index_classes = [MockPersonIndex]
+                fields = ["firstname"]
+
+        self.serializer1 = Serializer1
+        self.serializer2 = Serializer2
+
+    def test_serializer_field_blueprint_compiled_once(self):
+        fields1 = self.serializer1().get_fields()
+        blueprint = self.serializer1.__dict__["_field_blueprint"]
+        fields2 = self.serializer1().get_fields()
+
+        self.assertIs(self.serializer1.__dict__["_field_blueprint"], blueprint)
+        self.assertEqual(list(fields1.keys()), ["firstname", "lastname"])
+        self.assertEqual(list(fields1.keys()), list(fields2.keys()))
+        self.assertIsNot(fields1["firstname"], fields2["firstname"])
+
+    def test_serializer_field_blueprint_not_inherited(self):
+        self.serializer1().get_fields()
+        self.assertEqual(list(self.serializer2().get_fields().keys()), ["firstname"])
+
+    def test_serializer_clear_field_cache(self):
+        self.serializer1().get_fields()
+        self.serializer1.clear_field_cache()
+        self.assertFalse("_field_blueprint" in self.serializer1.__dict__)
+        self.assertEqual(list(self.serializer1().get_fields().keys()), ["firstname", "lastname"])
+
+
+class HaystackSerializerRepresentationPlanTestCase(SimpleTestCase):
+
+    def setUp(self):
+        class Serializer1(HaystackSerializer):
+            extra = serializers.SerializerMethodField()
+
+            class Meta:
+                index_classes = [MockPersonIndex, MockPetIndex]
+                fields = ["firstname", "lastname", "name", "species"]
+
+            def get_extra(self, instance):
+                return 1
+
+        self.serializer1 = Serializer1
+
+    def test_serializer_representation_plan_per_index(self):
+        serializer = self.serializer1()
+        person_plan = serializer._get_representation_plan(MockPersonIndex())
+        pet_plan = serializer._get_representation_plan(MockPetIndex())
+
+        self.assertEqual([key for key, field in person_plan], ["extra", "firstname", "lastname"])
+        self.assertEqual([key for key, field in pet_plan], ["extra", "name", "species"])
+        self.assertIs(pet_plan[1][1], serializer.fields["_MockPetIndex__name"])
+
+    def test_serializer_representation_plan_is_cached(self):
+        serializer = self.serializer1()
+        plan = serializer._get_representation_plan(MockPetIndex())
+        self.assertIs(serializer._get_representation_plan(MockPetIndex()), plan)
+
+
 class HaystackSerializerAllFieldsTestCase(TestCase):
 
     fixtures = ["mockallfield"]
@@ -431,6 +501,43 @@ class HaystackSerializerMoreLikeThisTestCase(APITestCase):
         )
 
 
+class HaystackSerializerHighlighterReuseTestCase(SimpleTestCase):
+
+    def setUp(self):
+        class CountingHighlighter(Highlighter):
+            instances = 0
+
+            def __init__(self, *args, **kwargs):
+                CountingHighlighter.instances += 1
+                super(CountingHighlighter, self).__init__(*args, **kwargs)
+
+        class Serializer1(HighlighterMixin, HaystackSerializer):
+            highlighter_class = CountingHighlighter
+            highlighter_field = "description"
+
+            class Meta:
+                index_classes = [MockPersonIndex]
+                fields = ["firstname", "description"]
+
+        self.highlighter_class = CountingHighlighter
+        self.serializer1 = Serializer1
+        self.results = [
+            SearchResult("mockapp", "mockperson", "1", 1.0, firstname="Jeremy", description="Jeremy is a nice chap!"),
+            SearchResult("mockapp", "mockperson", "2", 1.0, firstname="John", description="John is a nice chap!"),
+        ]
+
+    def test_highlighter_is_reused_for_all_results(self):
+        request = Request(APIRequestFactory().get("/", {"firstname": "jeremy", "q": "nice"}))
+        data = self.serializer1(self.results, many=True, context={"request": request}).data
+
+        self.assertEqual(self.highlighter_class.instances, 1)
+        self.assertEqual(
+            [result["highlighted"] for result in data],
+            ['<span class="highlighted">Jeremy</span> is a <span class="highlighted">nice</span> chap!',
+             '...<span class="highlighted">nice</span> chap!']
+        )
+
+
 @override_settings(ROOT_URLCONF="tests.test_serializers")
 class HaystackFacetSerializerTestCase(TestCase):
 
@@ -557,6 +664,86 @@ class HaystackFacetSerializerTestCase(TestCase):
             self.assertEqual(str(e), "%s must implement a Meta class or have the property _abstract" % "FacetSerializer")
 
 
+class HaystackFacetFieldSerializerTestCase(SimpleTestCase):
+
+    def setUp(self):
+        class FacetSerializer(HaystackFacetSerializer):
+            paginate_by_param = "page"
+
+            class Meta:
+                index_classes = [MockPersonIndex]
+                fields = ["firstname", "lastname"]
+
+        self.serializer_class = FacetSerializer
+        self.facet_counts = {
+            "fields": {
+                "firstname": [("John", 2), ("Abel", 1)],
+                "lastname": [("McClane", 1)]
+            },
+            "dates": {
+                "created": [(datetime(2015, 5, 1), 100)]
+            },
+            "queries": {}
+        }
+
+    def get_data(self, query_string="", serializer_class=None):
+        request = Request(APIRequestFactory().get("/search-person-facet/facets/?%s" % query_string))
+        context = {"request": request, "view": SearchPersonFacetViewSet(), "facet_query_params_text": "selected_facets"}
+        return (serializer_class or self.serializer_class)(self.facet_counts, context=context).data
+
+    def test_serializer_facet_text_and_count(self):
+        data = self.get_data()
+        self.assertEqual([(item["text"], item["count"]) for item in data["fields"]["firstname"]],
+                         [("John", 2), ("Abel", 1)])
+        self.assertEqual(data["dates"]["created"][0]["text"], "2015-05-01T00:00:00Z")
+        self.assertEqual(list(data["dates"]["created"][0]), ["text", "count", "narrow_url"])
+
+    def test_serializer_facet_fields_are_copied_from_template(self):
+        request = Request(APIRequestFactory().get("/search-person-facet/facets/"))
+        context = {"request": request, "view": SearchPersonFacetViewSet(), "facet_query_params_text": "selected_facets"}
+        serializer1 = self.serializer_class(self.facet_counts, context=context)
+        serializer2 = self.serializer_class(self.facet_counts, context=context)
+
+        self.assertIs(serializer1.get_facet_field_template(), serializer2.get_facet_field_template())
+        self.assertIsNot(serializer1.fields["fields"], serializer2.fields["fields"])
+
+        facet_field_serializer = serializer1.fields["dates"].child.child
+        self.assertIs(facet_field_serializer.root, serializer1)
+        self.assertIs(facet_field_serializer.instance, self.facet_counts["dates"])
+        self.assertIs(facet_field_serializer.fields["text"].parent, facet_field_serializer)
+
+    def test_serializer_facet_custom_field_serializer(self):
+        class CustomFacetFieldSerializer(FacetFieldSerializer):
+            upper = serializers.SerializerMethodField()
+
+            def get_upper(self, instance):
+                return six.text_type(instance[0]).upper()
+
+        class CustomFacetSerializer(self.serializer_class):
+            facet_field_serializer_class = CustomFacetFieldSerializer
+
+            class Meta(self.serializer_class.Meta):
+                pass
+
+        data = self.get_data(serializer_class=CustomFacetSerializer)
+        self.assertEqual(data["fields"]["firstname"][0]["upper"], "JOHN")
+        self.assertEqual(data["fields"]["firstname"][0]["count"], 2)
+
+    def test_serializer_facet_narrow_url(self):
+        data = self.get_data("page=2&firstname=John&selected_facets=lastname_exact:McClane")
+        self.assertEqual(
+            [item["narrow_url"] for item in data["fields"]["firstname"]],
+            ["http://testserver/search-person-facet/facets/?firstname=John"
+             "&selected_facets=firstname_exact%3AJohn&selected_facets=lastname_exact%3AMcClane",
+             "http://testserver/search-person-facet/facets/?firstname=John"
+             "&selected_facets=firstname_exact%3AAbel&selected_facets=lastname_exact%3AMcClane"]
+        )
+        self.assertEqual(
+            data["fields"]["lastname"][0]["narrow_url"],
+            "http://testserver/search-person-facet/facets/?firstname=John&selected_facets=lastname_exact%3AMcClane"
+        )
+
+
 class HaystackSerializerMixinTestCase(WarningTestCaseMixin, TestCase):
 
     fixtures = ["mockperson"]
@@ -597,6 +784,16 @@ class HaystackSerializerMixinTestCase(WarningTestCaseMixin, TestCase):
             }]
         )
 
+    def test_serializer_mixin_loads_objects_in_bulk(self):
+        objs = SearchQuerySet().filter(firstname="John")
+        serializer = self.serializer1(instance=objs, many=True)
+        self.assertIsInstance(serializer, HaystackObjectListSerializer)
+
+        with self.assertNumQueries(1):
+            data = serializer.data
+        self.assertEqual(len(data), 3)
+        self.assertTrue(all(result["firstname"] == "John" for result in data))
+
 
 class HaystackMultiSerializerTestCase(WarningTestCaseMixin, TestCase):
 
@@ -649,6 +846,73 @@ class HaystackMultiSerializerTestCase(WarningTestCaseMixin, TestCase):
         )
 
 
+class HaystackMultiSerializerReuseTestCase(SimpleTestCase):
+
+    def setUp(self):
+        class MockPetSerializer(HaystackSerializer):
+            class Meta:
+                index_classes = [MockPetIndex]
+                fields = ("name", "species")
+
+        class Serializer1(HaystackSerializer):
+            class Meta:
+                serializers = {
+                    MockPetIndex: MockPetSerializer
+                }
+
+        self.serializer1 = Serializer1
+        self.results = [
+            SearchResult("mockapp", "mockpet", "1", 1.0, name="Zane", species="Dog"),
+            SearchResult("mockapp", "mockpet", "2", 1.0, name="Iggy", species="Iguana"),
+        ]
+
+    def test_multi_serializer_reuses_child_serializer(self):
+        serializer = self.serializer1(instance=self.results, many=True, context={"spam": "eggs"})
+        self.assertEqual(serializer.data, [
+            {"name": "Zane", "species": "Dog"},
+            {"name": "Iggy", "species": "Iguana"}
+        ])
+
+        child_serializers = serializer.child._child_serializers
+        self.assertEqual(list(child_serializers.keys()), [MockPetIndex])
+        self.assertEqual(child_serializers[MockPetIndex].context, {"spam": "eggs"})
+
+
+class HaystackSerializerMixinManyInitTestCase(SimpleTestCase):
+
+    def setUp(self):
+        class MockPersonSerializer(serializers.ModelSerializer):
+            class Meta:
+                model = MockPerson
+                fields = ("id", "firstname", "lastname")
+
+        class Serializer1(HaystackSerializerMixin, MockPersonSerializer):
+            class Meta(MockPersonSerializer.Meta):
+                search_fields = ["text", ]
+
+        self.serializer1 = Serializer1
+
+    def test_many_init_builds_list_serializer(self):
+        serializer = self.serializer1(instance=[], many=True, context={"spam": "eggs"})
+        self.assertIs(type(serializer), HaystackObjectListSerializer)
+        self.assertIs(serializer.child.parent, serializer)
+        self.assertEqual(serializer.child.context, {"spam": "eggs"})
+
+    def test_many_init_list_kwargs(self):
+        serializer = self.serializer1(instance=[], many=True, allow_empty=False)
+        self.assertFalse(serializer.allow_empty)
+
+    def test_many_init_list_serializer_class(self):
+        class ListSerializer(HaystackObjectListSerializer):
+            pass
+
+        class Serializer2(self.serializer1):
+            class Meta(self.serializer1.Meta):
+                list_serializer_class = ListSerializer
+
+        self.assertIs(type(Serializer2(instance=[], many=True)), ListSerializer)
+
+
 class TestHaystackSerializerMeta(SimpleTestCase):
 
     def test_abstract_not_inherited(self):
@@ -2,9 +2,15 @@
 
 from __future__ import absolute_import, unicode_literals
 
-from django.test import TestCase
+import threading
+import time
+from concurrent.futures import TimeoutError
 
-from drf_haystack.utils import merge_dict
+from django.test import SimpleTestCase, TestCase
+
+from drf_haystack.utils import IndexModelResolver, LRUCache, merge_dict, run_concurrently
+
+from .mockapp.models import MockPerson, MockPet
 
 
 class MergeDictTestCase(TestCase):
@@ -53,3 +59,68 @@ class MergeDictTestCase(TestCase):
 
     def test_utils_merge_dict_invalid_input(self):
         self.assertEqual(merge_dict(self.dict_a, "I'm not a dict!"), "I'm not a dict!")
+
+
+class LRUCacheTestCase(SimpleTestCase):
+
+    def test_utils_lru_cache_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+
+        cache.set("c", 3)
+        self.assertEqual(len(cache), 2)
+        self.assertFalse("b" in cache)
+        self.assertEqual(cache.get("b", "missing"), "missing")
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_utils_lru_cache_disabled(self):
+        cache = LRUCache(maxsize=0)
+        cache.set("a", 1)
+        self.assertEqual(len(cache), 0)
+
+
+class IndexModelResolverTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.resolver = IndexModelResolver(max_unknown_names=1)
+
+    def test_utils_resolve_indexed_model(self):
+        self.assertIs(self.resolver.resolve("mockapp.mockperson"), MockPerson)
+        self.assertIs(self.resolver.resolve("MockApp.MockPet"), MockPet)
+
+    def test_utils_resolve_unknown_model(self):
+        self.assertIsNone(self.resolver.resolve("spam"))
+        self.assertIsNone(self.resolver.resolve("auth.user"))
+        self.assertTrue("auth.user" in self.resolver._unknown_names)
+        self.assertFalse("spam" in self.resolver._unknown_names)
+
+
+class RunConcurrentlyTestCase(SimpleTestCase):
+
+    def test_utils_run_concurrently_results_in_order(self):
+        results = run_concurrently([
+            lambda: threading.current_thread().name,
+            lambda: threading.current_thread().name,
+        ])
+        self.assertEqual(results[0], threading.current_thread().name)
+        self.assertTrue(results[1].startswith("drf_haystack_queries"))
+
+    def test_utils_run_concurrently_in_pool_with_timeout(self):
+        results = run_concurrently([
+            lambda: threading.current_thread().name,
+            lambda: threading.current_thread().name,
+        ], timeout=1)
+        self.assertTrue(all(name.startswith("drf_haystack_queries") for name in results))
+
+    def test_utils_run_concurrently_timeout(self):
+        with self.assertRaises(TimeoutError):
+            run_concurrently([lambda: None, lambda: time.sleep(0.5)], timeout=0.05)
+        with self.assertRaises(TimeoutError):
+            run_concurrently([lambda: time.sleep(0.5), lambda: None], timeout=0.05)
+
+    def test_utils_run_concurrently_exception(self):
+        with self.assertRaises(ZeroDivisionError):
+            run_concurrently([lambda: None, lambda: 1 / 0])
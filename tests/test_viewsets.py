@@ -5,23 +5,30 @@
 
 from __future__ import absolute_import, unicode_literals
 
+import asyncio
 import json
+import threading
+import time
 from unittest import skipIf
 
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 from django.contrib.auth.models import User
 
 from haystack.query import SearchQuerySet
 
 from rest_framework import status
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import LimitOffsetPagination, PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
 from rest_framework.routers import SimpleRouter
+from rest_framework import serializers
 from rest_framework.serializers import Serializer
 from rest_framework.test import force_authenticate, APIRequestFactory
 
+from drf_haystack.asgi import AsyncHaystackViewSet
 from drf_haystack.viewsets import HaystackViewSet
 from drf_haystack.serializers import HaystackSerializer, HaystackFacetSerializer
-from drf_haystack.mixins import MoreLikeThisMixin, FacetMixin
+from drf_haystack.mixins import ExportMixin, MoreLikeThisMixin, FacetMixin
 
 from . import restframework_version
 from .mockapp.models import MockPerson, MockPet
@@ -101,6 +108,17 @@ class HaystackViewSetTestCase(TestCase):
         response = self.view1.as_view(actions={"get": "retrieve"})(request, pk=100000)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_viewset_get_object_native_document_lookup(self):
+        setattr(self.view1, "document_uid_field", "django_id")
+        setattr(self.view1, "native_document_lookup", True)
+        request = factory.get(path="/", data="", content_type="application/json")
+        response = self.view1.as_view(actions={"get": "retrieve"})(request, pk=1)
+        not_found = self.view1.as_view(actions={"get": "retrieve"})(request, pk=100000)
+        setattr(self.view1, "document_uid_field", "id")
+        setattr(self.view1, "native_document_lookup", False)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(not_found.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_viewset_get_object_invalid_lookup_field(self):
         request = factory.get(path="/", data="", content_type="application/json")
         self.assertRaises(
@@ -308,3 +326,196 @@ class PaginatedHaystackViewSetTestCase(TestCase):
 
         self.assertEqual(content["previous"], "http://testserver/")
         self.assertEqual(content["next"], "http://testserver/?page=3")
+
+
+class FacetObjectsPrefetchTestCase(SimpleTestCase):
+
+    def setUp(self):
+        fetched = self.fetched = []
+
+        class RecordingSearchQuerySet(SearchQuerySet):
+            def _fill_cache(self, start, end, **kwargs):
+                fetched.append((start, end))
+                return False
+
+        class NumberPagination(PageNumberPagination):
+            page_size = 5
+
+        class ViewSet(FacetMixin, HaystackViewSet):
+            index_models = [MockPerson]
+            pagination_class = NumberPagination
+
+        self.queryset = RecordingSearchQuerySet().facet("firstname")
+        self.view_class = ViewSet
+
+    def get_view(self, data, pagination_class=None):
+        view = self.view_class()
+        if pagination_class is not None:
+            view.pagination_class = pagination_class
+        view.request = Request(factory.get(path="/", data=data))
+        return view
+
+    def test_prefetch_page_number_pagination(self):
+        self.get_view({"page": 3}).prefetch_facet_objects(self.queryset)
+        self.assertEqual(self.fetched, [(10, 15)])
+
+    def test_prefetch_limit_offset_pagination(self):
+        view = self.get_view({"limit": 4, "offset": 8}, pagination_class=LimitOffsetPagination)
+        view.prefetch_facet_objects(self.queryset)
+        self.assertEqual(self.fetched, [(8, 12)])
+
+    def test_prefetch_skips_unknown_page(self):
+        self.get_view({"page": "last"}).prefetch_facet_objects(self.queryset)
+        self.assertEqual(self.fetched, [])
+
+
+class ExportMixinTestCase(SimpleTestCase):
+
+    def setUp(self):
+        fetched = self.fetched = []
+        results = self.results = [
+            {"firstname": firstname, "lastname": "Doe", "id": "mockapp.mockperson.%d" % index}
+            for index, firstname in enumerate(["John", "Jane", "Jeremy", "Jack", "Jill"])
+        ]
+
+        class StubSearchQuerySet(SearchQuerySet):
+            def __getitem__(self, k):
+                fetched.append(self.query.build_query())
+                start = 2 * (len(fetched) - 1)
+                return results[start:start + k.stop]
+
+        class PersonSerializer(serializers.Serializer):
+            firstname = serializers.CharField()
+            lastname = serializers.CharField()
+
+            class Meta:
+                fields = ["firstname", "lastname"]
+
+        class ViewSet(ExportMixin, HaystackViewSet):
+            index_models = [MockPerson]
+            serializer_class = PersonSerializer
+            export_chunk_size = 2
+
+            def get_queryset(self, index_models=[]):
+                return StubSearchQuerySet()
+
+        self.view = ViewSet.as_view(actions={"get": "export"})
+
+    def export(self, data=None):
+        response = self.view(factory.get(path="/export/", data=data or {}))
+        return response, b"".join(response.streaming_content).decode("utf-8")
+
+    def test_export_ndjson_in_chunks(self):
+        response, content = self.export()
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="export.ndjson"')
+        self.assertEqual(
+            [json.loads(line)["firstname"] for line in content.splitlines()],
+            ["John", "Jane", "Jeremy", "Jack", "Jill"]
+        )
+        self.assertEqual(self.fetched, [
+            "*:*",
+            'id:({"mockapp.mockperson.1" TO *})',
+            'id:({"mockapp.mockperson.3" TO *})',
+        ])
+
+    def test_export_leaves_out_results_without_position(self):
+        del self.results[3]["id"]
+        response, content = self.export()
+        self.assertEqual(
+            [json.loads(line)["firstname"] for line in content.splitlines()],
+            ["John", "Jane", "Jeremy", "Jill"]
+        )
+        self.assertEqual(self.fetched[-1], 'id:({"mockapp.mockperson.2" TO *})')
+
+    def test_export_csv(self):
+        response, content = self.export({"export_format": "csv"})
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(content.splitlines()[:2], ["firstname,lastname", "John,Doe"])
+        self.assertEqual(len(content.splitlines()), 6)
+
+    def test_export_unsupported_format(self):
+        response = self.view(factory.get(path="/export/", data={"export_format": "xml"}))
+        self.assertEqual(response.status_code, 404)
+
+
+class AsyncHaystackViewSetTestCase(SimpleTestCase):
+
+    def setUp(self):
+        class ViewSet(AsyncHaystackViewSet):
+            index_models = [MockPerson]
+
+            def list(self, request, *args, **kwargs):
+                return Response({"thread": threading.current_thread().name})
+
+        self.view = ViewSet.as_view(actions={"get": "list"})
+
+    def test_async_view(self):
+        self.assertTrue(asyncio.iscoroutinefunction(self.view))
+        self.assertTrue(self.view.csrf_exempt)
+        self.assertEqual(self.view.actions, {"get": "list"})
+
+    def test_view_runs_in_executor(self):
+        response = asyncio.run(self.view(factory.get(path="/")))
+        response.render()
+        self.assertTrue(json.loads(response.content.decode())["thread"].startswith("drf_haystack"))
+
+
+class ConcurrentFacetsTestCase(SimpleTestCase):
+
+    def setUp(self):
+        calls = self.calls = {}
+
+        class FacetSerializer(HaystackFacetSerializer):
+            serialize_objects = True
+
+            class Meta:
+                index_classes = [MockPersonIndex]
+                fields = ["firstname"]
+
+        class ViewSet(FacetMixin, HaystackViewSet):
+            index_models = [MockPerson]
+            facet_serializer_class = FacetSerializer
+            facet_concurrent = True
+            facet_timeout = 0.1
+            delay = 0
+            counts_delay = 0
+
+            def filter_facet_queryset(self, queryset):
+                return queryset.facet("firstname")
+
+            def get_facet_counts(self, queryset):
+                time.sleep(self.counts_delay)
+                calls["facet_counts"] = (threading.current_thread().name, dict(queryset.query.facets))
+                return {}
+
+            def prefetch_facet_objects(self, queryset):
+                time.sleep(self.delay)
+                calls["objects"] = (threading.current_thread().name, dict(queryset.query.facets))
+
+            def get_facet_serializer(self, facet_counts, objects, many=False):
+                return Serializer()
+
+        self.view_class = ViewSet
+
+    def get(self, delay, **initkwargs):
+        view = self.view_class.as_view(actions={"get": "facets"}, delay=delay, **initkwargs)
+        return view(factory.get(path="/facets/"))
+
+    def test_concurrent_facet_counts_and_objects(self):
+        self.assertEqual(self.get(delay=0).status_code, 200)
+        self.assertTrue(self.calls["facet_counts"][0].startswith("drf_haystack_queries"))
+        self.assertEqual(len(self.calls["facet_counts"][1]), 1)
+        self.assertTrue(self.calls["objects"][0].startswith("drf_haystack_queries"))
+        self.assertEqual(self.calls["objects"][1], {})
+
+    def test_facet_timeout(self):
+        self.assertEqual(self.get(delay=0.5).status_code, 504)
+
+    def test_facet_counts_timeout(self):
+        self.assertEqual(self.get(delay=0, counts_delay=0.5).status_code, 504)
+
+    def test_prefetch_objects_without_facets(self):
+        self.assertEqual(self.get(delay=0, facet_concurrent=False, facet_cache_timeout=60).status_code, 200)
+        self.assertEqual(self.calls["objects"], (threading.current_thread().name, {}))
+        self.assertEqual(len(self.calls["facet_counts"][1]), 1)